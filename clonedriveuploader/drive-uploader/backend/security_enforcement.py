@@ -10,11 +10,49 @@ import sys
 import re
 import shlex
 import subprocess
+import time
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 import ast
+import functools
 from urllib.parse import urlparse
 
+# Motor de regex do scan: google-re2 (DFA linear em C++) quando disponível
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+# Arquivos não-Python acima deste tamanho são ignorados no scan
+MAX_SCAN_FILE_SIZE = 1_000_000
+
+# Arquivos gerados (minificados / source maps) não trazem sinal para o scan
+SKIPPED_FILE_SUFFIXES = (".min.js", ".min.css", ".map")
+
+# Bytes inspecionados para detectar arquivos binários
+BINARY_PROBE_SIZE = 512
+
+# Validade (segundos) do resultado de scan reaproveitado entre relatório e correção
+SCAN_CACHE_TTL = 30
+
+@functools.lru_cache(maxsize=None)
+def compile_scan_pattern(pattern: str, flags: int = 0):
+    """
+    Compila um padrão do scan usando re2 quando possível, com fallback para re
+    """
+    # google-re2 não aceita flags inteiras: só IGNORECASE/MULTILINE têm equivalente
+    if re2 is not None and not flags & ~(re.IGNORECASE | re.MULTILINE):
+        options = re2.Options()
+        options.case_sensitive = not flags & re.IGNORECASE
+        # MULTILINE não existe em re2.Options, então vai inline no padrão
+        re2_pattern = f"(?m){pattern}" if flags & re.MULTILINE else pattern
+        try:
+            return re2.compile(re2_pattern, options)
+        except re2.error:
+            # re2 não suporta lookarounds/backreferences
+            pass
+    return re.compile(pattern, flags)
+
 class SecurityEnforcer:
     """
     Aplica regras de segurança baseadas na análise forense de dependências
@@ -23,46 +61,68 @@ class SecurityEnforcer:
     def __init__(self):
         self.project_root = Path(__file__).parent
         self.violations = []
+        self._last_scan = None  # (timestamp, resultados)
         
         # Regras de segurança baseadas na análise forense
+        # Cada padrão existe apenas aqui e é referenciado pelo seu id
         self.security_rules = {
             "no_shell_true": {
                 "description": "Proibir shell=True em subprocess (Caso de Estudo 1)",
                 "severity": "CRITICAL",
-                "patterns": [
-                    r'subprocess\.(call|check_call|run|Popen).*shell\s*=\s*True',
-                    r'os\.system\s*\(',
-                    r'commands\.(getoutput|getstatusoutput)\s*\('
-                ]
+                "flags": re.MULTILINE | re.IGNORECASE,
+                "patterns": {
+                    "shell_true": r'subprocess\.(call|check_call|run|Popen).*shell\s*=\s*True',
+                    "os_system": r'os\.system\s*\(',
+                    "commands_module": r'commands\.(getoutput|getstatusoutput)\s*\('
+                }
             },
             "no_unsafe_xmlrpc": {
                 "description": "Usar defusedxml.xmlrpc ao invés de xmlrpc padrão (Caso de Estudo 2)",
                 "severity": "HIGH",
-                "patterns": [
-                    r'import\s+xmlrpc\.client',
-                    r'from\s+xmlrpc\.client\s+import',
-                    r'xmlrpc\.client\.',
-                ]
+                "flags": re.MULTILINE | re.IGNORECASE,
+                "patterns": {
+                    "import": r'import\s+xmlrpc\.client',
+                    "from_import": r'from\s+xmlrpc\.client\s+import',
+                    "attribute": r'xmlrpc\.client\.'
+                }
             },
             "no_insecure_websockets": {
                 "description": "Usar wss:// ao invés de ws:// em produção (Caso de Estudo 3)",
                 "severity": "MEDIUM",
-                "patterns": [
-                    r'ws://(?!.*test)',  # ws:// mas não em contexto de teste
-                    r'WebSocket\s*\(\s*["\']ws://'
-                ]
+                "flags": re.MULTILINE | re.IGNORECASE,
+                "patterns": {
+                    "ws_url": r'ws://[^\s"\']+'
+                }
             },
             "no_hardcoded_secrets": {
                 "description": "Proibir credenciais hardcoded",
                 "severity": "CRITICAL",
-                "patterns": [
-                    r'GOOGLE_CLIENT_ID\s*=\s*["\'][^"\']{20,}["\']',
-                    r'GOOGLE_CLIENT_SECRET\s*=\s*["\'][^"\']{20,}["\']',
-                    r'SECRET_KEY\s*=\s*["\'][^"\']{10,}["\']',
-                    r'GOCSPX-[a-zA-Z0-9_-]+',
-                    r'[0-9]+-[a-zA-Z0-9_]+\.apps\.googleusercontent\.com'
-                ]
+                "flags": re.MULTILINE,
+                "patterns": {
+                    "google_client_id": r'[0-9]+-[a-zA-Z0-9_]+\.apps\.googleusercontent\.com',
+                    "google_client_secret": r'GOCSPX-[a-zA-Z0-9_-]+',
+                    "generic_secret": r'(SECRET_KEY|API_KEY|CLIENT_SECRET)\s*=\s*["\'][^"\']{20,}["\']'
+                }
+            }
+        }
+        
+        # Validador responsável por cada regra
+        self.rule_validators = {
+            "no_shell_true": self.validate_subprocess_usage,
+            "no_unsafe_xmlrpc": self.validate_xmlrpc_usage,
+            "no_insecure_websockets": self.validate_websocket_security,
+            "no_hardcoded_secrets": self.validate_secrets_security
+        }
+        assert self.rule_validators.keys() == self.security_rules.keys(), \
+            "Toda regra de segurança precisa de exatamente um validador"
+        
+        # Padrões compilados uma única vez, indexados por regra e id do padrão
+        self._compiled_rules = {
+            rule_id: {
+                pattern_id: compile_scan_pattern(pattern, rule["flags"])
+                for pattern_id, pattern in rule["patterns"].items()
             }
+            for rule_id, rule in self.security_rules.items()
         }
     
     def validate_subprocess_usage(self, file_path: Path, content: str) -> List[Dict[str, Any]]:
@@ -71,37 +131,29 @@ class SecurityEnforcer:
         """
         violations = []
         
-        # Detectar uso de shell=True
-        shell_true_pattern = r'subprocess\.(call|check_call|run|Popen).*shell\s*=\s*True'
-        matches = re.finditer(shell_true_pattern, content, re.MULTILINE | re.IGNORECASE)
-        
-        for match in matches:
-            line_num = content[:match.start()].count('\n') + 1
-            violations.append({
-                "file": str(file_path),
-                "line": line_num,
-                "rule": "no_shell_true",
-                "severity": "CRITICAL",
-                "message": "shell=True detectado - use lista de comandos ao invés",
-                "code_snippet": match.group(0),
-                "mitigation": "Use subprocess.run(['comando', 'arg1', 'arg2']) ao invés de shell=True"
-            })
-        
-        # Detectar uso de os.system
-        os_system_pattern = r'os\.system\s*\('
-        matches = re.finditer(os_system_pattern, content, re.MULTILINE | re.IGNORECASE)
+        # Mensagem e mitigação para cada padrão da regra
+        messages = {
+            "shell_true": ("shell=True detectado - use lista de comandos ao invés",
+                           "Use subprocess.run(['comando', 'arg1', 'arg2']) ao invés de shell=True"),
+            "os_system": ("os.system detectado - extremamente inseguro",
+                          "Use subprocess.run com lista de comandos"),
+            "commands_module": ("módulo commands detectado - executa via shell",
+                                "Use subprocess.run com lista de comandos")
+        }
         
-        for match in matches:
-            line_num = content[:match.start()].count('\n') + 1
-            violations.append({
-                "file": str(file_path),
-                "line": line_num,
-                "rule": "no_shell_true",
-                "severity": "CRITICAL",
-                "message": "os.system detectado - extremamente inseguro",
-                "code_snippet": match.group(0),
-                "mitigation": "Use subprocess.run com lista de comandos"
-            })
+        for pattern_id, pattern in self._compiled_rules["no_shell_true"].items():
+            message, mitigation = messages[pattern_id]
+            for match in pattern.finditer(content):
+                line_num = content[:match.start()].count('\n') + 1
+                violations.append({
+                    "file": str(file_path),
+                    "line": line_num,
+                    "rule": "no_shell_true",
+                    "severity": "CRITICAL",
+                    "message": message,
+                    "code_snippet": match.group(0),
+                    "mitigation": mitigation
+                })
         
         return violations
     
@@ -112,14 +164,8 @@ class SecurityEnforcer:
         violations = []
         
         # Detectar import inseguro de xmlrpc
-        patterns = [
-            r'import\s+xmlrpc\.client',
-            r'from\s+xmlrpc\.client\s+import',
-            r'xmlrpc\.client\.'
-        ]
-        
-        for pattern in patterns:
-            matches = re.finditer(pattern, content, re.MULTILINE | re.IGNORECASE)
+        for pattern in self._compiled_rules["no_unsafe_xmlrpc"].values():
+            matches = pattern.finditer(content)
             for match in matches:
                 line_num = content[:match.start()].count('\n') + 1
                 violations.append({
@@ -141,8 +187,7 @@ class SecurityEnforcer:
         violations = []
         
         # Detectar ws:// em contexto de produção (não teste)
-        ws_pattern = r'ws://[^\s"\']+'
-        matches = re.finditer(ws_pattern, content, re.MULTILINE | re.IGNORECASE)
+        matches = self._compiled_rules["no_insecure_websockets"]["ws_url"].finditer(content)
         
         for match in matches:
             line_num = content[:match.start()].count('\n') + 1
@@ -173,15 +218,8 @@ class SecurityEnforcer:
         """
         violations = []
         
-        # Padrões para detectar credenciais hardcoded
-        credential_patterns = {
-            "google_client_id": r'[0-9]+-[a-zA-Z0-9_]+\.apps\.googleusercontent\.com',
-            "google_client_secret": r'GOCSPX-[a-zA-Z0-9_-]+',
-            "generic_secret": r'(SECRET_KEY|API_KEY|CLIENT_SECRET)\s*=\s*["\'][^"\']{20,}["\']'
-        }
-        
-        for cred_type, pattern in credential_patterns.items():
-            matches = re.finditer(pattern, content, re.MULTILINE)
+        for cred_type, pattern in self._compiled_rules["no_hardcoded_secrets"].items():
+            matches = pattern.finditer(content)
             for match in matches:
                 line_num = content[:match.start()].count('\n') + 1
                 
@@ -210,8 +248,8 @@ class SecurityEnforcer:
         Valida segurança de um arquivo específico
         """
         try:
-            content = file_path.read_text(encoding='utf-8')
-        except Exception as e:
+            raw = file_path.read_bytes()
+        except OSError as e:
             return [{
                 "file": str(file_path),
                 "line": 0,
@@ -221,20 +259,64 @@ class SecurityEnforcer:
                 "mitigation": "Verificar codificação e permissões do arquivo"
             }]
         
+        # Arquivo binário: nada a validar
+        if b'\x00' in raw[:4096]:
+            return []
+        
+        # Decodificação tolerante: problemas de encoding não abortam o scan
+        content = raw.decode('utf-8', errors='ignore')
+        
         violations = []
         
         # Aplicar todas as validações
-        violations.extend(self.validate_subprocess_usage(file_path, content))
-        violations.extend(self.validate_xmlrpc_usage(file_path, content))
-        violations.extend(self.validate_websocket_security(file_path, content))
-        violations.extend(self.validate_secrets_security(file_path, content))
+        for validator in self.rule_validators.values():
+            violations.extend(validator(file_path, content))
+        
+        for violation in violations:
+            violation["_rendered"] = self.render_violation(violation)
         
         return violations
     
-    def scan_project_security(self) -> Dict[str, Any]:
+    def render_violation(self, v: Dict[str, Any]) -> str:
+        """
+        Formata o bloco de relatório de uma violação (uma única vez, na criação)
+        """
+        lines = [f"   📍 {v['file']}:{v['line']}", f"      {v['message']}"]
+        if v["severity"] == "CRITICAL":
+            lines.append(f"      Código: {v['code_snippet']}")
+        if v["severity"] in ("CRITICAL", "HIGH"):
+            lines.append(f"      Solução: {v['mitigation']}")
+        lines.append("")
+        return "\n".join(lines)
+    
+    def should_skip_file(self, file_path: Path) -> bool:
+        """
+        Indica se o arquivo deve ser ignorado (minificado, muito grande ou binário)
+        """
+        name = file_path.name
+        if name.endswith(SKIPPED_FILE_SUFFIXES):
+            return True
+        
+        try:
+            if file_path.stat().st_size > MAX_SCAN_FILE_SIZE and not name.endswith(".py"):
+                return True
+            with open(file_path, 'rb') as f:
+                return b'\x00' in f.read(BINARY_PROBE_SIZE)
+        except OSError:
+            # Deixa validate_file_security reportar o erro de leitura
+            return False
+    
+    def scan_project_security(self, use_cache: bool = True) -> Dict[str, Any]:
         """
         Executa scan completo de segurança do projeto
+        
+        Com use_cache=True reaproveita um scan feito há menos de SCAN_CACHE_TTL segundos
         """
+        if use_cache and self._last_scan is not None:
+            timestamp, cached_results = self._last_scan
+            if time.monotonic() - timestamp < SCAN_CACHE_TTL:
+                return cached_results
+        
         print("🔍 Iniciando scan de segurança do projeto...")
         
         # Arquivos para analisar
@@ -247,6 +329,10 @@ class SecurityEnforcer:
                 if any(skip in str(file_path) for skip in ["venv", "__pycache__", "node_modules"]):
                     continue
                 
+                # Pular arquivos minificados, muito grandes ou binários
+                if self.should_skip_file(file_path):
+                    continue
+                
                 violations = self.validate_file_security(file_path)
                 all_violations.extend(violations)
         
@@ -269,6 +355,7 @@ class SecurityEnforcer:
             "compliance": len(critical) == 0 and len(high) == 0
         }
         
+        self._last_scan = (time.monotonic(), results)
         return results
     
     def calculate_security_score(self, violations: List[Dict[str, Any]]) -> int:
@@ -316,28 +403,19 @@ class SecurityEnforcer:
         if results['violations']['critical']:
             report.append("🚨 VIOLAÇÕES CRÍTICAS (Ação Imediata Necessária):")
             for v in results['violations']['critical']:
-                report.append(f"   📍 {v['file']}:{v['line']}")
-                report.append(f"      {v['message']}")
-                report.append(f"      Código: {v['code_snippet']}")
-                report.append(f"      Solução: {v['mitigation']}")
-                report.append("")
+                report.append(v['_rendered'])
         
         # Violações altas
         if results['violations']['high']:
             report.append("⚠️  VIOLAÇÕES ALTAS:")
             for v in results['violations']['high']:
-                report.append(f"   📍 {v['file']}:{v['line']}")
-                report.append(f"      {v['message']}")
-                report.append(f"      Solução: {v['mitigation']}")
-                report.append("")
+                report.append(v['_rendered'])
         
         # Violações médias
         if results['violations']['medium']:
             report.append("📋 VIOLAÇÕES MÉDIAS:")
             for v in results['violations']['medium']:
-                report.append(f"   📍 {v['file']}:{v['line']}")
-                report.append(f"      {v['message']}")
-                report.append("")
+                report.append(v['_rendered'])
         
         if results['compliance']:
             report.append("🎉 PARABÉNS! Projeto em compliance de segurança!")
@@ -371,10 +449,11 @@ class SecurityEnforcer:
 if __name__ == "__main__":
     enforcer = SecurityEnforcer()
     
-    if len(sys.argv) > 1 and sys.argv[1] == "--report":
+    # --report e --fix podem ser combinados; o scan é feito uma única vez
+    if "--report" in sys.argv:
         print(enforcer.generate_security_report())
-    elif len(sys.argv) > 1 and sys.argv[1] == "--fix":
+    if "--fix" in sys.argv:
         auto_fix = "--auto-fix" in sys.argv
         enforcer.fix_security_violations(auto_fix)
-    else:
+    if "--report" not in sys.argv and "--fix" not in sys.argv:
         print("Uso: python security_enforcement.py [--report] [--fix] [--auto-fix]")
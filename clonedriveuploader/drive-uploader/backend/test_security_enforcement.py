@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Testes do motor de regex usado pelo scan do Security Enforcement
+"""
+
+import importlib.util
+import re
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import security_enforcement
+from security_enforcement import compile_scan_pattern
+
+
+class _FakeRe2Error(Exception):
+    pass
+
+
+class TestCompileScanPattern(unittest.TestCase):
+    """Escolha entre re2 e re em compile_scan_pattern"""
+
+    def setUp(self):
+        compile_scan_pattern.cache_clear()
+
+    def tearDown(self):
+        compile_scan_pattern.cache_clear()
+
+    def _fake_re2(self):
+        return SimpleNamespace(
+            Options=lambda: SimpleNamespace(case_sensitive=True),
+            compile=MagicMock(return_value='re2-pattern'),
+            error=_FakeRe2Error,
+        )
+
+    @unittest.skipUnless(importlib.util.find_spec('re2'), "google-re2 não instalado")
+    def test_re2_used_when_installed(self):
+        """Com google-re2 instalado o padrão é compilado pelo re2, com IGNORECASE e MULTILINE"""
+        pattern = compile_scan_pattern(r'^foo\.bar\s*\(', re.MULTILINE | re.IGNORECASE)
+        self.assertNotIsInstance(pattern, re.Pattern)
+        self.assertEqual(type(pattern).__module__.split('.')[0], 're2')
+        self.assertIsNotNone(pattern.search("x = 1\nFOO.BAR('ls')"))
+
+    def test_re2_options_and_inline_multiline(self):
+        """Flags viram re2.Options(case_sensitive=False) e (?m) inline"""
+        fake = self._fake_re2()
+        with patch.object(security_enforcement, 're2', fake):
+            result = compile_scan_pattern(r'foo\.bar', re.MULTILINE | re.IGNORECASE)
+        self.assertEqual(result, 're2-pattern')
+        compiled_pattern, options = fake.compile.call_args.args
+        self.assertEqual(compiled_pattern, r'(?m)foo\.bar')
+        self.assertFalse(options.case_sensitive)
+
+    def test_case_sensitive_without_ignorecase(self):
+        fake = self._fake_re2()
+        with patch.object(security_enforcement, 're2', fake):
+            compile_scan_pattern(r'api_key', re.MULTILINE)
+        compiled_pattern, options = fake.compile.call_args.args
+        self.assertEqual(compiled_pattern, r'(?m)api_key')
+        self.assertTrue(options.case_sensitive)
+
+    def test_fallback_when_re2_rejects_pattern(self):
+        """Padrões que o re2 não suporta (lookarounds) caem no re"""
+        fake = self._fake_re2()
+        fake.compile.side_effect = _FakeRe2Error("invalid perl operator: (?!")
+        with patch.object(security_enforcement, 're2', fake):
+            pattern = compile_scan_pattern(r'foo(?!bar)', re.MULTILINE)
+        self.assertIsInstance(pattern, re.Pattern)
+        self.assertEqual(pattern.flags & re.MULTILINE, re.MULTILINE)
+
+    def test_unsupported_flags_use_re(self):
+        fake = self._fake_re2()
+        with patch.object(security_enforcement, 're2', fake):
+            pattern = compile_scan_pattern(r'a.b', re.DOTALL)
+        fake.compile.assert_not_called()
+        self.assertIsInstance(pattern, re.Pattern)
+
+    def test_fallback_without_re2(self):
+        with patch.object(security_enforcement, 're2', None):
+            pattern = compile_scan_pattern(r'foo\.bar', re.IGNORECASE)
+        self.assertIsInstance(pattern, re.Pattern)
+        self.assertIsNotNone(pattern.search("FOO.BAR("))
+
+
+if __name__ == "__main__":
+    unittest.main()
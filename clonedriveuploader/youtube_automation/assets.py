@@ -1,6 +1,12 @@
 from typing import Dict
 from google.cloud import texttospeech
 import time
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import tempfile
 import google.generativeai as genai
 
 import subprocess
@@ -8,6 +14,75 @@ import re
 import shlex
 from pathlib import Path
 
+IMAGE_MODEL_NAME = 'gemini-2.0-flash'
+
+# Cache de imagens do Gemini, indexado por hash de prompt + modelo + configuração
+GEMINI_IMAGE_CACHE_DIR = Path.home() / ".cache" / "ythub" / "gemini_images"
+
+# Limite de requisições simultâneas ao Gemini (respeitar quota)
+MAX_CONCURRENT_IMAGE_REQUESTS = 8
+
+# SynthesizeSpeech aceita até 5000 bytes por requisição; margem de segurança
+TTS_MAX_CHUNK_BYTES = 4800
+MAX_CONCURRENT_TTS_REQUESTS = 10
+
+_SENTENCE_BOUNDARY_RE = re.compile(r"(?<=[.!?…])\s+")
+
+# Padrão seguro: apenas letras, números, espaços, hífens, underscores e pontos
+_SAFE_FILENAME_RE = re.compile(r"^[a-zA-Z0-9\s\._-]+$")
+
+
+def _split_utf8(text: str, max_bytes: int) -> list:
+    """
+    Corta o texto em pedaços de até max_bytes sem partir caracteres multi-byte
+    """
+    data = text.encode("utf-8")
+    pieces = []
+    while len(data) > max_bytes:
+        cut = max_bytes
+        # Bytes de continuação UTF-8 (10xxxxxx) não podem iniciar um pedaço
+        while cut > 0 and data[cut] & 0xC0 == 0x80:
+            cut -= 1
+        if cut == 0:
+            raise ValueError(f"max_bytes ({max_bytes}) menor que um caractere UTF-8")
+        pieces.append(data[:cut].decode("utf-8"))
+        data = data[cut:]
+    pieces.append(data.decode("utf-8"))
+    return pieces
+
+
+def split_tts_chunks(text: str, max_bytes: int = TTS_MAX_CHUNK_BYTES) -> list:
+    """
+    Divide o texto em blocos de até max_bytes (UTF-8) respeitando fim de frase
+    """
+    chunks = []
+    current = ""
+    for sentence in _SENTENCE_BOUNDARY_RE.split(text.strip()):
+        candidate = f"{current} {sentence}" if current else sentence
+        if len(candidate.encode("utf-8")) <= max_bytes:
+            current = candidate
+            continue
+        if current:
+            chunks.append(current)
+        # Frase maior que o limite: quebra por palavras
+        current = ""
+        for word in sentence.split():
+            if len(word.encode("utf-8")) > max_bytes:
+                # Palavra/trecho sem espaços maior que o limite: corte por bytes
+                if current:
+                    chunks.append(current)
+                *pieces, current = _split_utf8(word, max_bytes)
+                chunks.extend(pieces)
+                continue
+            candidate = f"{current} {word}" if current else word
+            if current and len(candidate.encode("utf-8")) > max_bytes:
+                chunks.append(current)
+                candidate = word
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
 
 def validate_filename(filename: str) -> bool:
     """
@@ -16,9 +91,7 @@ def validate_filename(filename: str) -> bool:
     if not filename or len(filename) > 255:
         return False
     
-    # Padrão seguro: apenas letras, números, espaços, hífens, underscores e pontos
-    safe_pattern = re.compile(r"^[a-zA-Z0-9\s\._-]+$")
-    return bool(safe_pattern.fullmatch(filename))
+    return bool(_SAFE_FILENAME_RE.fullmatch(filename))
 
 def safe_subprocess_run(command_list, **kwargs):
     """
@@ -38,7 +111,8 @@ def safe_subprocess_run(command_list, **kwargs):
         'capture_output': True,   # Capturar stdout/stderr
         'text': True,            # Decodificar como texto
         'check': False,          # Não levantar exceção automaticamente
-        'timeout': 300           # Timeout de 5 minutos
+        'timeout': 300,          # Timeout de 5 minutos
+        'bufsize': 1 << 20       # Pipe de 1 MB: menos syscalls ao capturar stderr longo do FFmpeg
     }
     
     # Atualizar com kwargs fornecidos
@@ -66,9 +140,10 @@ def safe_subprocess_run(command_list, **kwargs):
         print(f"Erro inesperado: {e}")
         raise
 
-def process_media_file_secure(input_filename: str, output_filename: str, command_type: str = "convert"):
+def build_media_command(input_filename: str, output_filename: str, command_type: str = "convert",
+                        threads: str = "0") -> list:
     """
-    Processa arquivo de mídia de forma segura
+    Valida os nomes de arquivo e monta o comando FFmpeg (lista de argumentos)
     """
     # 1. VALIDAÇÃO RIGOROSA DA ENTRADA
     if not validate_filename(input_filename) or not validate_filename(output_filename):
@@ -85,6 +160,7 @@ def process_media_file_secure(input_filename: str, output_filename: str, command
         cmd_list = [
             "ffmpeg",
             "-y",                    # Sobrescrever arquivo de saída
+            "-threads", threads,     # "0" = threads automáticas
             "-i", str(input_path),   # Arquivo de entrada
             "-acodec", "libmp3lame", # Codec de áudio
             "-b:a", "128k",          # Bitrate
@@ -95,6 +171,7 @@ def process_media_file_secure(input_filename: str, output_filename: str, command
         cmd_list = [
             "ffmpeg",
             "-y",
+            "-threads", threads,
             "-i", str(input_path),
             "-vn",                   # Sem vídeo
             "-acodec", "copy",       # Copiar codec de áudio
@@ -103,16 +180,87 @@ def process_media_file_secure(input_filename: str, output_filename: str, command
     else:
         raise ValueError(f"Tipo de comando não suportado: {command_type}")
     
+    return cmd_list
+
+def process_media_file_secure(input_filename: str, output_filename: str, command_type: str = "convert"):
+    """
+    Processa arquivo de mídia de forma segura
+    """
+    cmd_list = build_media_command(input_filename, output_filename, command_type)
+    
     # 3. EXECUÇÃO SEGURA
     return safe_subprocess_run(cmd_list)
 
+def process_many(jobs: list, max_parallel: int = None) -> list:
+    """
+    Processa vários arquivos de mídia com processos FFmpeg em paralelo
+    
+    jobs: lista de tuplas (entrada, saída, tipo_de_comando)
+    Retorna um subprocess.CompletedProcess por job, na mesma ordem
+    """
+    # Validar todos os jobs antes de iniciar qualquer processo.
+    # Cada FFmpeg usa 1 thread para não disputar núcleos com os demais
+    commands = [build_media_command(*job, threads="1") for job in jobs]
+    if max_parallel is None:
+        max_parallel = max(1, (os.cpu_count() or 2) // 2)
+    return asyncio.run(_run_commands_async(commands, max_parallel))
+
+async def _run_commands_async(commands: list, max_parallel: int) -> list:
+    semaphore = asyncio.Semaphore(max_parallel)
+    
+    async def _one(cmd_list):
+        async with semaphore:
+            process = await asyncio.create_subprocess_exec(
+                *cmd_list,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE
+            )
+            try:
+                _, stderr = await asyncio.wait_for(process.communicate(), timeout=300)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                raise
+        if process.returncode != 0:
+            print(f"Comando falhou com código {process.returncode}: {cmd_list}")
+        return subprocess.CompletedProcess(cmd_list, process.returncode, None, stderr.decode(errors="ignore"))
+    
+    return await asyncio.gather(*(_one(cmd_list) for cmd_list in commands))
+
 
 from pathlib import Path
 
+# Loop de eventos persistente do módulo. O genai cacheia o cliente assíncrono
+# (grpc.aio) e ele fica preso ao primeiro loop em que foi usado, então cada lote
+# (thumbnails, cenas, TTS) roda neste mesmo loop em vez de um asyncio.run por lote.
+_event_loop = None
+
+
+def _run_async(coro):
+    """Executa a corrotina sempre no mesmo loop de eventos do módulo"""
+    global _event_loop
+    if _event_loop is None or _event_loop.is_closed():
+        _event_loop = asyncio.new_event_loop()
+    return _event_loop.run_until_complete(coro)
+
+
 class AssetProductionModule:
     def __init__(self, service_manager):
         self.service_manager = service_manager
+        # Clientes de longa duração: reaproveitam canal gRPC e credenciais entre chamadas
         self.tts_client = texttospeech.TextToSpeechClient()
+        # Configuração para voz brasileira natural (fixa: criada uma única vez)
+        self._tts_voice = texttospeech.VoiceSelectionParams(
+            language_code="pt-BR",
+            name="pt-BR-Neural2-A",  # Voz feminina brasileira
+            ssml_gender=texttospeech.SsmlVoiceGender.FEMALE
+        )
+        self._tts_audio_config = texttospeech.AudioConfig(
+            audio_encoding=texttospeech.AudioEncoding.MP3,
+            speaking_rate=1.0,
+            pitch=0.0
+        )
+        self._image_model = genai.GenerativeModel(IMAGE_MODEL_NAME)
     
     def safe_media_process(self, input_path, output_path, process_type="convert"):
         """
@@ -144,35 +292,94 @@ class AssetProductionModule:
     def generate_audio_tts(self, script: str, output_path: str) -> str:
         """
         Gera áudio com Google TTS (1M caracteres grátis/mês)
-        """
-        # Configuração para voz brasileira natural
-        synthesis_input = texttospeech.SynthesisInput(text=script)
-        voice = texttospeech.VoiceSelectionParams(
-            language_code="pt-BR",
-            name="pt-BR-Neural2-A",  # Voz feminina brasileira
-            ssml_gender=texttospeech.SsmlVoiceGender.FEMALE
-        )
-        audio_config = texttospeech.AudioConfig(
-            audio_encoding=texttospeech.AudioEncoding.MP3,
-            speaking_rate=1.0,
-            pitch=0.0
-        )
         
-        response = self.tts_client.synthesize_speech(
-            input=synthesis_input, voice=voice, audio_config=audio_config
+        Scripts longos são divididos em blocos sintetizados em paralelo e
+        concatenados em ordem (frames MP3 podem ser concatenados diretamente)
+        """
+        audio_parts = _run_async(
+            self._synthesize_chunks_async(split_tts_chunks(script))
         )
         
         with open(output_path, "wb") as out:
-            out.write(response.audio_content)
+            out.write(b"".join(audio_parts))
+        
+        return output_path
+    
+    def generate_scenes_audio_tts(self, scenes: list, output_path: str) -> str:
+        """
+        Gera um único MP3 com a narração de todas as cenas
+        
+        O áudio de cada cena vai direto para o stdin de um processo FFmpeg,
+        sem arquivos intermediários por cena
+        """
+        if not validate_filename(Path(output_path).name):
+            raise ValueError(f"Nome de arquivo inválido detectado: '{output_path}'")
+        
+        cmd_list = [
+            "ffmpeg",
+            "-y",
+            "-v", "error",           # stderr curto: evita bloquear o pipe
+            "-f", "mp3",
+            "-i", "pipe:0",          # Frames MP3 concatenados via stdin
+            "-c", "copy",
+            output_path
+        ]
         
+        def audio_stream():
+            for scene in scenes:
+                audio_parts = _run_async(
+                    self._synthesize_chunks_async(split_tts_chunks(scene))
+                )
+                yield from audio_parts
+        
+        self._pipe_to_ffmpeg(cmd_list, audio_stream())
         return output_path
     
+    def _pipe_to_ffmpeg(self, cmd_list: list, audio_chunks) -> None:
+        """
+        Escreve os blocos de áudio no stdin de um processo FFmpeg, à medida que chegam
+        """
+        process = subprocess.Popen(
+            cmd_list,
+            shell=False,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            bufsize=1 << 20
+        )
+        
+        try:
+            for audio_content in audio_chunks:
+                process.stdin.write(audio_content)
+            _, stderr = process.communicate(timeout=300)
+        except BaseException:
+            process.kill()
+            process.wait()
+            raise
+        
+        if process.returncode != 0:
+            raise RuntimeError(f"Erro no processamento: {stderr.decode(errors='ignore')}")
+    
+    async def _synthesize_chunks_async(self, chunks: list) -> list:
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_TTS_REQUESTS)
+        
+        async def _one(chunk):
+            async with semaphore:
+                # O cliente síncrono é thread-safe e reaproveita o mesmo canal gRPC
+                response = await asyncio.to_thread(
+                    self.tts_client.synthesize_speech,
+                    input=texttospeech.SynthesisInput(text=chunk),
+                    voice=self._tts_voice,
+                    audio_config=self._tts_audio_config
+                )
+            return response.audio_content
+        
+        return await asyncio.gather(*(_one(chunk) for chunk in chunks))
+    
     def generate_thumbnails_gemini(self, title: str) -> Dict[str, str]:
         """
         Gera thumbnails A/B usando Gemini 2.0 Flash Image Generation
         """
-        thumbnails = {}
-        
         prompts = {
             'A': f"""
             Crie uma thumbnail profissional de YouTube para "{title}".
@@ -196,35 +403,86 @@ class AssetProductionModule:
             """
         }
         
-        for version, prompt in prompts.items():
-            response = genai.GenerativeModel('gemini-2.0-flash').generate_content(
-                prompt,
-                generation_config={
-                    "response_modalities": ["IMAGE", "TEXT"],
-                    "temperature": 0.7
-                }
-            )
-            
-            thumbnail_path = f"thumbnail_{version}_{int(time.time())}.jpg"
-            if response.parts:
-                for part in response.parts:
-                    if part.inline_data:
-                        with open(thumbnail_path, "wb") as f:
-                            f.write(part.inline_data.data)
-            
-            thumbnails[version] = thumbnail_path
+        return _run_async(self._generate_thumbnails_async(prompts))
+    
+    async def _generate_thumbnails_async(self, prompts: Dict[str, str]) -> Dict[str, str]:
+        timestamp = int(time.time())
+        generation_config = {
+            "response_modalities": ["IMAGE", "TEXT"],
+            "temperature": 0.7
+        }
+        
+        async def _gen(version, prompt):
+            thumbnail_path = f"thumbnail_{version}_{timestamp}.jpg"
+            await self._generate_image_cached(prompt, thumbnail_path, generation_config)
+            return version, thumbnail_path
         
-        return thumbnails
+        # Variantes A e B são independentes: gerar em paralelo
+        results = await asyncio.gather(*(_gen(version, prompt) for version, prompt in prompts.items()))
+        return dict(results)
     
     def generate_scene_images(self, scenes: list) -> list:
         """
-        Gera imagens para cenas do roteiro
+        Gera imagens para cenas do roteiro (requisições concorrentes ao Gemini)
         """
-        scene_images = []
-        for i, scene in enumerate(scenes):
+        return _run_async(self._generate_scene_images_async(scenes))
+    
+    async def _generate_scene_images_async(self, scenes: list) -> list:
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_IMAGE_REQUESTS)
+        timestamp = int(time.time())
+        
+        async def _one(i, scene):
             prompt = f"Crie imagem para cena de horror: {scene[:100]}"
-            response = genai.GenerativeModel('gemini-2.0-flash').generate_content(prompt)
-            image_path = f"scene_{i}_{int(time.time())}.jpg"
-            # Salvar imagem (lógica similar ao thumbnail)
-            scene_images.append(image_path)
-        return scene_images
+            image_path = f"scene_{i}_{timestamp}.jpg"
+            async with semaphore:
+                await self._generate_image_cached(prompt, image_path)
+            return image_path
+        
+        # gather preserva a ordem das cenas
+        return list(await asyncio.gather(*(_one(i, scene) for i, scene in enumerate(scenes))))
+    
+    async def _generate_image_cached(self, prompt: str, image_path: str, generation_config: Dict = None) -> None:
+        """
+        Gera imagem com o Gemini, reaproveitando o cache em disco para prompts repetidos
+        """
+        cache_path = self._image_cache_path(prompt, generation_config)
+        if cache_path.exists():
+            await asyncio.to_thread(shutil.copyfile, cache_path, image_path)
+            return
+        
+        if generation_config:
+            response = await self._image_model.generate_content_async(prompt, generation_config=generation_config)
+        else:
+            response = await self._image_model.generate_content_async(prompt)
+        
+        image_data = self._inline_image_data(response)
+        if image_data is not None:
+            await asyncio.to_thread(self._store_image, image_data, image_path, cache_path)
+    
+    def _image_cache_path(self, prompt: str, generation_config: Dict = None) -> Path:
+        key = hashlib.sha256(
+            prompt.encode() + IMAGE_MODEL_NAME.encode()
+            + json.dumps(generation_config or {}, sort_keys=True).encode()
+        ).hexdigest()
+        return GEMINI_IMAGE_CACHE_DIR / f"{key}.jpg"
+    
+    def _inline_image_data(self, response):
+        """
+        Retorna os bytes da imagem retornada inline pelo Gemini (ou None)
+        """
+        image_data = None
+        if response.parts:
+            for part in response.parts:
+                if part.inline_data:
+                    image_data = part.inline_data.data
+        return image_data
+    
+    def _store_image(self, image_data: bytes, image_path: str, cache_path: Path) -> None:
+        with open(image_path, "wb") as f:
+            f.write(image_data)
+        
+        # Escrita atômica no cache: evita arquivos parciais com acesso concorrente
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=cache_path.parent, delete=False) as tmp:
+            tmp.write(image_data)
+        os.replace(tmp.name, cache_path)
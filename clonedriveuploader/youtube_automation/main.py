@@ -1,33 +1,41 @@
 import os
 from fastapi import FastAPI
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, Response
 import google_auth_oauthlib.flow
 import json
 
 app = FastAPI()
 
-# Configuração do OAuth
-oauth_config = json.loads(os.environ['GOOGLE_OAUTH_SECRETS'])
-oauth_flow = google_auth_oauthlib.flow.Flow.from_client_config(
-    oauth_config,
-    scopes=[
-        "https://www.googleapis.com/auth/userinfo.email",
-        "openid",
-        "https://www.googleapis.com/auth/userinfo.profile",
+OAUTH_SCOPES = [
+    "https://www.googleapis.com/auth/userinfo.email",
+    "openid",
+    "https://www.googleapis.com/auth/userinfo.profile",
+]
+
+# Configurações públicas (sem secrets): montadas e serializadas uma única vez
+_PUBLIC_CONFIG = {
+    "client_id": os.getenv('GOOGLE_CLIENT_ID'),
+    "redirect_uris": os.getenv('REDIRECT_URIS'),
+    "scopes": [
+        "https://www.googleapis.com/auth/drive.file",
+        "https://www.googleapis.com/auth/userinfo.profile"
     ]
-)
+}
+_PUBLIC_CONFIG_JSON = json.dumps(_PUBLIC_CONFIG).encode("utf-8")
+
+@app.on_event("startup")
+async def load_oauth_config():
+    """Configuração do OAuth (carregada na inicialização, fora das requisições)"""
+    oauth_config = json.loads(os.environ['GOOGLE_OAUTH_SECRETS'])
+    app.state.oauth_flow = google_auth_oauthlib.flow.Flow.from_client_config(
+        oauth_config,
+        scopes=OAUTH_SCOPES
+    )
 
 @app.get("/api/config")
 async def get_config():
     """Retorna configurações públicas (sem secrets)"""
-    return {
-        "client_id": os.getenv('GOOGLE_CLIENT_ID'),
-        "redirect_uris": os.getenv('REDIRECT_URIS'),
-        "scopes": [
-            "https://www.googleapis.com/auth/drive.file",
-            "https://www.googleapis.com/auth/userinfo.profile"
-        ]
-    }
+    return Response(content=_PUBLIC_CONFIG_JSON, media_type="application/json")
 
 @app.get("/api/oauth/callback")
 async def oauth_callback():
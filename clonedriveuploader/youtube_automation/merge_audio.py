@@ -3,11 +3,16 @@ import os
 import subprocess
 import re
 import shlex
-from pathlib import Path
+import json
+import tempfile
+import wave
 from pathlib import Path
 
-def merge_wav_files(wav_paths, output_path):
+# Tamanho aproximado de cada bloco copiado na concatenação de WAV
+WAV_COPY_CHUNK_BYTES = 1 << 20
 
+# Padrão seguro para arquivos de áudio
+_SAFE_AUDIO_RE = re.compile(r"^[a-zA-Z0-9\s\._-]+\.(mp3|wav|aac|m4a|ogg)$", re.IGNORECASE)
 
 def validate_audio_filename(filename: str) -> bool:
     """
@@ -16,9 +21,47 @@ def validate_audio_filename(filename: str) -> bool:
     if not filename or len(filename) > 255:
         return False
     
-    # Padrão seguro para arquivos de áudio
-    safe_pattern = re.compile(r"^[a-zA-Z0-9\s\._-]+\.(mp3|wav|aac|m4a|ogg)$", re.IGNORECASE)
-    return bool(safe_pattern.fullmatch(filename))
+    return bool(_SAFE_AUDIO_RE.fullmatch(filename))
+
+def _probe_audio_stream(audio_file: str):
+    """
+    Retorna (codec, taxa, canais) do primeiro stream de áudio, ou None se o ffprobe falhar
+    """
+    try:
+        result = subprocess.run(
+            ["ffprobe", "-v", "error", "-select_streams", "a:0",
+             "-show_entries", "stream=codec_name,sample_rate,channels",
+             "-of", "json", audio_file],
+            shell=False,
+            capture_output=True,
+            text=True,
+            check=False,
+            timeout=30
+        )
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        return None
+    
+    if result.returncode != 0:
+        return None
+    
+    streams = json.loads(result.stdout or "{}").get("streams", [])
+    if not streams:
+        return None
+    stream = streams[0]
+    return stream.get("codec_name"), stream.get("sample_rate"), stream.get("channels")
+
+def _can_stream_copy(audio_files: list, output_filename: str) -> bool:
+    """
+    Indica se todas as entradas são MP3 com o mesmo formato (concat sem re-encode)
+    """
+    if not output_filename.lower().endswith(".mp3"):
+        return False
+    
+    first = _probe_audio_stream(audio_files[0])
+    if first is None or first[0] != "mp3":
+        return False
+    
+    return all(_probe_audio_stream(audio_file) == first for audio_file in audio_files[1:])
 
 def safe_merge_audio(audio_files: list, output_filename: str, fade_duration: float = 1.0):
     """
@@ -45,29 +88,44 @@ def safe_merge_audio(audio_files: list, output_filename: str, fade_duration: flo
     
     # 2. CONSTRUÇÃO SEGURA DO COMANDO FFMPEG
     cmd_list = ["ffmpeg", "-y"]  # -y para sobrescrever
+    concat_list_path = None
     
-    # Adicionar inputs
-    for audio_file in validated_files:
-        cmd_list.extend(["-i", audio_file])
-    
-    # Filtro para concatenar com fade
-    filter_complex = ""
-    for i, _ in enumerate(validated_files):
-        if i == 0:
-            filter_complex = f"[{i}:a]"
-        else:
-            filter_complex += f"[{i}:a]"
-    
-    filter_complex += f"concat=n={len(validated_files)}:v=0:a=1[outa]"
-    
-    # Adicionar filtro e output
-    cmd_list.extend([
-        "-filter_complex", filter_complex,
-        "-map", "[outa]",
-        "-acodec", "libmp3lame",
-        "-b:a", "192k",
-        output_filename
-    ])
+    if _can_stream_copy(validated_files, output_filename):
+        # Entradas homogêneas: concat demuxer apenas reescreve os pacotes (sem re-encode)
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as concat_list:
+            for audio_file in validated_files:
+                concat_list.write(f"file '{Path(audio_file).resolve()}'\n")
+            concat_list_path = concat_list.name
+        
+        cmd_list.extend([
+            "-f", "concat",
+            "-safe", "0",
+            "-i", concat_list_path,
+            "-c", "copy",
+            output_filename
+        ])
+    else:
+        # Adicionar inputs
+        for audio_file in validated_files:
+            cmd_list.extend(["-i", audio_file])
+        
+        # Filtro para concatenar com fade
+        filter_complex = (
+            "".join(f"[{i}:a]" for i in range(len(validated_files)))
+            + f"concat=n={len(validated_files)}:v=0:a=1[outa]"
+        )
+        
+        # Adicionar filtro e output
+        cmd_list.extend([
+            "-filter_complex", filter_complex,
+            "-map", "[outa]",
+            "-acodec", "libmp3lame",
+            "-b:a", "192k",
+            # Paraleliza o filter graph (libmp3lame em si é single-thread)
+            "-threads", "0",
+            "-filter_complex_threads", str(os.cpu_count() or 1),
+            output_filename
+        ])
     
     # 3. EXECUÇÃO SEGURA
     try:
@@ -78,7 +136,8 @@ def safe_merge_audio(audio_files: list, output_filename: str, fade_duration: flo
             capture_output=True,
             text=True,
             check=False,
-            timeout=600  # 10 minutos timeout
+            timeout=600,  # 10 minutos timeout
+            bufsize=1 << 20  # Pipe de 1 MB para a captura do stderr do FFmpeg
         )
         
         if result.returncode != 0:
@@ -99,25 +158,59 @@ def safe_merge_audio(audio_files: list, output_filename: str, fade_duration: flo
     except Exception as e:
         print(f"Erro inesperado no merge de áudio: {e}")
         raise
+    finally:
+        if concat_list_path:
+            os.remove(concat_list_path)
 
+def _wav_format(path: Path):
+    """
+    Retorna (canais, largura de amostra, taxa, compressão) de um WAV
+    """
+    with wave.open(str(path), 'rb') as wav:
+        params = wav.getparams()
+    return params.nchannels, params.sampwidth, params.framerate, params.comptype
 
+def merge_wav_files(wav_paths, output_path):
     """
     Combina arquivos WAV de forma segura
+    
+    Entradas com o mesmo formato PCM são concatenadas diretamente, sem
+    decodificar; formatos divergentes usam o pydub
     """
-    combined = AudioSegment.empty()
+    valid_paths = []
     for path in wav_paths:
         # Validação de path para prevenir path traversal
         safe_path = Path(path).resolve()
         if not safe_path.exists() or not str(safe_path).endswith('.wav'):
             print(f"⚠️ Arquivo inválido ou não encontrado: {path}")
             continue
-            
-        audio = AudioSegment.from_wav(str(safe_path))
-        combined += audio
+        valid_paths.append(safe_path)
     
     # Validação do path de saída
     safe_output = Path(output_path).resolve()
-    combined.export(str(safe_output), format="wav")
+    
+    formats = {_wav_format(path) for path in valid_paths}
+    if len(formats) == 1:
+        nchannels, sampwidth, framerate, _ = formats.pop()
+        chunk_frames = max(1, WAV_COPY_CHUNK_BYTES // (nchannels * sampwidth))
+        with wave.open(str(safe_output), 'wb') as out:
+            out.setnchannels(nchannels)
+            out.setsampwidth(sampwidth)
+            out.setframerate(framerate)
+            for path in valid_paths:
+                with wave.open(str(path), 'rb') as wav:
+                    while True:
+                        frames = wav.readframes(chunk_frames)
+                        if not frames:
+                            break
+                        # close() corrige o tamanho no cabeçalho uma única vez
+                        out.writeframesraw(frames)
+    else:
+        combined = AudioSegment.empty()
+        for path in valid_paths:
+            combined += AudioSegment.from_wav(str(path))
+        combined.export(str(safe_output), format="wav")
+    
     print(f"🧩 Áudio combinado salvo em {safe_output}")
 
 def safe_ffmpeg_command(input_files, output_file):
@@ -154,4 +247,5 @@ if __name__ == "__main__":
         "assets/audio/scene_3.wav",
     ]
     merge_output = "assets/audio/final_audio.wav"
-    merge_wav_files(audio_paths, merge_output)put)
+    merge_wav_files(audio_paths, merge_output)
+
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Testes do módulo de produção de assets (divisão de texto e narração via TTS)
+"""
+
+import io
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+try:
+    import assets
+except ImportError:  # google-cloud-texttospeech / google-generativeai ausentes
+    assets = None
+
+
+@unittest.skipIf(assets is None, "dependências do assets.py não instaladas")
+class TestSplitTtsChunks(unittest.TestCase):
+    """Blocos enviados ao TTS nunca passam do limite em bytes UTF-8"""
+
+    def _assert_within_limit(self, chunks, max_bytes):
+        for chunk in chunks:
+            with self.subTest(chunk=chunk):
+                self.assertLessEqual(len(chunk.encode("utf-8")), max_bytes)
+
+    def test_sentences_grouped_up_to_limit(self):
+        chunks = assets.split_tts_chunks("Primeira frase. Segunda frase. Terceira.", max_bytes=32)
+        self.assertEqual(chunks, ["Primeira frase. Segunda frase.", "Terceira."])
+
+    def test_long_sentence_split_by_words(self):
+        text = "palavra " * 20
+        chunks = assets.split_tts_chunks(text, max_bytes=30)
+        self._assert_within_limit(chunks, 30)
+        self.assertEqual(" ".join(chunks), text.strip())
+
+    def test_oversize_token_is_hard_split(self):
+        """Um trecho sem espaços maior que o limite é cortado por bytes"""
+        token = "a" * 25
+        chunks = assets.split_tts_chunks(f"início {token} fim", max_bytes=10)
+        self._assert_within_limit(chunks, 10)
+        self.assertEqual(chunks, ["início", "aaaaaaaaaa", "aaaaaaaaaa", "aaaaa fim"])
+
+    def test_multibyte_token_not_split_mid_character(self):
+        """Cortes caem em fronteiras de caractere UTF-8 (2, 3 e 4 bytes)"""
+        for token in ("ç" * 15, "語" * 11, "😱" * 9, "açã語😱" * 4):
+            with self.subTest(token=token):
+                chunks = assets.split_tts_chunks(token, max_bytes=10)
+                self._assert_within_limit(chunks, 10)
+                # decode sem erro e concatenação igual ao original
+                self.assertEqual("".join(chunks), token)
+
+    def test_limit_smaller_than_character(self):
+        with self.assertRaises(ValueError):
+            assets.split_tts_chunks("😱😱", max_bytes=3)
+
+
+@unittest.skipIf(assets is None, "dependências do assets.py não instaladas")
+class TestScenesAudioTts(unittest.TestCase):
+    """Narração das cenas enviada em ordem para um único FFmpeg"""
+
+    def setUp(self):
+        with patch.object(assets.texttospeech, 'TextToSpeechClient'), \
+             patch.object(assets.genai, 'GenerativeModel'):
+            self.module = assets.AssetProductionModule(service_manager=None)
+        # Áudio "sintetizado" = texto do bloco, para conferir a ordem no stdin
+        self.module.tts_client.synthesize_speech.side_effect = \
+            lambda input, **kwargs: SimpleNamespace(audio_content=input.text.encode())
+        self.stdin = io.BytesIO()
+        self.process = MagicMock(stdin=self.stdin, returncode=0)
+        self.process.communicate.return_value = (None, b"")
+
+    def test_scenes_piped_in_order(self):
+        scenes = ["Cena um. Frase dois.", "Cena dois.", "Cena três."]
+        with patch.object(assets, 'split_tts_chunks', side_effect=lambda text: text.split(". ")), \
+             patch.object(assets.subprocess, 'Popen', return_value=self.process) as mock_popen:
+            result = self.module.generate_scenes_audio_tts(scenes, "narracao.mp3")
+
+        self.assertEqual(result, "narracao.mp3")
+        mock_popen.assert_called_once()
+        cmd_list = mock_popen.call_args.args[0]
+        self.assertEqual(cmd_list[0], "ffmpeg")
+        self.assertEqual(cmd_list[-1], "narracao.mp3")
+        self.assertFalse(mock_popen.call_args.kwargs["shell"])
+        self.assertEqual(self.stdin.getvalue(), b"Cena umFrase dois.Cena dois.Cena tr\xc3\xaas.")
+
+    def test_ffmpeg_failure_raises(self):
+        self.process.returncode = 1
+        self.process.communicate.return_value = (None, b"erro do ffmpeg")
+        with patch.object(assets.subprocess, 'Popen', return_value=self.process):
+            with self.assertRaisesRegex(RuntimeError, "erro do ffmpeg"):
+                self.module.generate_scenes_audio_tts(["Cena."], "narracao.mp3")
+
+    def test_invalid_filename_rejected(self):
+        with patch.object(assets.subprocess, 'Popen') as mock_popen:
+            with self.assertRaises(ValueError):
+                self.module.generate_scenes_audio_tts(["Cena."], "saida;rm.mp3")
+        mock_popen.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
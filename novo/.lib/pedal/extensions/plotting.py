@@ -5,6 +5,8 @@ Mock module for Sandbox.
 
 Assertions.
 """
+import weakref
+
 from pedal import Feedback, CompositeFeedbackFunction, is_sandbox_result, Sandbox
 from pedal.assertions import ensure_function_call, prevent_function_call
 from pedal.core.feedback import FeedbackResponse
@@ -20,6 +22,25 @@ PLOT_LABEL = {'plot': 'line plot',
               'hist': 'histogram',
               'scatter': 'scatter plot'}
 
+MATPLOTLIB_NAMES = ('plot', 'hist', 'scatter',
+                    'title', 'xlabel', 'ylabel', 'show')
+
+# Hashes of the student's plotted data, kept per mocked plotting module so
+# that repeated assertions reuse them without writing into the plot dicts.
+_GIVEN_HASHES = weakref.WeakKeyDictionary()
+
+
+def _all_name_nodes(ast):
+    """
+    Returns every Name node in the given tree, walking it at most once.
+    The list is stored on the tree itself; since ``parse_program`` caches one
+    tree per source string, changed code always gets a fresh list.
+    """
+    names = vars(ast).get('_cached_name_nodes')
+    if names is None:
+        names = ast._cached_name_nodes = ast.find_all("Name")
+    return names
+
 
 class plt_rename_err(Feedback):
     title = "Wrong MatPlotLib Import"
@@ -36,7 +57,7 @@ class plt_rename_err(Feedback):
 
     def condition(self):
         ast = parse_program(report=self.report)
-        plts = [n for n in ast.find_all("Name") if n.id == 'plt']
+        plts = [n for n in _all_name_nodes(ast) if n.id == 'plt']
         if plts and any(def_use_error(plt) for plt in plts):
             return True
         return False
@@ -58,15 +79,16 @@ class plt_wrong_import(Feedback):
 
     def condition(self):
         ast = parse_program(report=self.report)
-        matplotlib_names = ['plot', 'hist', 'scatter',
-                            'title', 'xlabel', 'ylabel', 'show']
-        for name in matplotlib_names:
-            for n in ast.find_all("Name"):
-                if n.id == name:
-                    if def_use_error(n):
-                        self.fields['actual'] = name
-                        self.fields['expected'] = "plt." + name
-                        return True
+        # Walk the tree once, bucketing the Names we care about
+        uses = {name: [] for name in MATPLOTLIB_NAMES}
+        for n in _all_name_nodes(ast):
+            if n.id in uses:
+                uses[n.id].append(n)
+        for name in MATPLOTLIB_NAMES:
+            if any(def_use_error(n) for n in uses[name]):
+                self.fields['actual'] = name
+                self.fields['expected'] = "plt." + name
+                return True
         return False
 
 
@@ -102,7 +124,69 @@ class ensure_show(Feedback):
         return not function_is_called("show")
 
 
-def compare_data(plt_type, correct, given, special_comparison=None):
+def _split_correct(plt_type, correct):
+    """ Infers the expected x and y values from the instructor's data. """
+    if plt_type == 'hist':
+        return None, correct
+    elif not correct:
+        return [], []
+    elif isinstance(correct[0], (tuple, list)):
+        # We were given a list of lists of ints
+        correct_xs, correct_ys = correct
+        return correct_xs, correct_ys
+    else:
+        # Assume it is a singular list
+        return list(range(len(correct))), correct
+
+
+def _hash_data(data):
+    """ Hashes a sequence of values, or returns None if that's impossible. """
+    try:
+        return hash(tuple(data))
+    except TypeError:
+        return None
+
+
+def hash_correct_data(plt_type, correct):
+    """
+    Precomputes the hashes of the expected x and y values, so that
+    :func:`compare_data` can cheaply reject plots when checking many of them.
+
+    Args:
+        plt_type (str): The expected type of this plot
+        correct (List of Int or List of List of Int): The expected data.
+    Returns:
+        tuple: The hashes of the x and y values (either may be None).
+    """
+    correct_xs, correct_ys = _split_correct(plt_type, correct)
+    return _hash_data(correct_xs), _hash_data(correct_ys)
+
+
+def _given_hash(given, key, given_hashes):
+    """ Hashes ``given[key]``, memoized in ``given_hashes`` when provided. """
+    data = given[key]
+    if given_hashes is None:
+        return _hash_data(data)
+    # Entries keep the data they were computed for, so a reused id never matches
+    cached = given_hashes.get((id(given), key))
+    if cached is None or cached[0] is not data:
+        cached = given_hashes[id(given), key] = (data, _hash_data(data))
+    return cached[1]
+
+
+def _same_data(expected, expected_hash, given, key, special_comparison, given_hashes=None):
+    if special_comparison is not None:
+        return special_comparison(expected, given[key])
+    if expected_hash is not None:
+        given_hash = _given_hash(given, key, given_hashes)
+        # Different hashes mean different data; equal hashes still need ==
+        if given_hash is not None and given_hash != expected_hash:
+            return False
+    return expected == given[key]
+
+
+def compare_data(plt_type, correct, given, special_comparison=None, correct_hashes=None,
+                 given_hashes=None):
     """
     Determines whether the given data matches any of the data found in the
     correct data. This handles plots of different types: if a histogram
@@ -114,35 +198,23 @@ def compare_data(plt_type, correct, given, special_comparison=None):
         given (Dict): The actual plotted data and information
         special_comparison (callable): A special comparison function to use
             between the data. If None, then will use the ``==`` operator.
+        correct_hashes (tuple): The result of :func:`hash_correct_data` for
+            this data, used to skip the ``==`` check on mismatched plots.
+        given_hashes (dict): Optional memo for the hashes of ``given``'s data,
+            shared between calls that check the same plots.
     Returns:
         bool: Whether the correct data was found in the given plot.
     """
-    if special_comparison is None:
-        def special_comparison(left, right):
-            return left == right
-
-    # Infer arguments
-    if plt_type == 'hist':
-        correct_xs = None
-        correct_ys = correct
-    elif not correct:
-        correct_xs = []
-        correct_ys = []
-    elif isinstance(correct[0], (tuple, list)):
-        # We were given a list of lists of ints
-        correct_xs, correct_ys = correct
-    else:
-        # Assume it is a singular list
-        correct_xs = list(range(len(correct)))
-        correct_ys = correct
+    correct_xs, correct_ys = _split_correct(plt_type, correct)
+    xs_hash, ys_hash = correct_hashes or (None, None)
 
     if given['type'] == 'hist':
-        return special_comparison(correct_ys, given['values'])
+        return _same_data(correct_ys, ys_hash, given, 'values', special_comparison, given_hashes)
     elif plt_type == 'hist':
-        return special_comparison(correct_ys, given['y'])
+        return _same_data(correct_ys, ys_hash, given, 'y', special_comparison, given_hashes)
     else:
-        return (special_comparison(correct_xs, given['x']) and
-                special_comparison(correct_ys, given['y']))
+        return (_same_data(correct_xs, xs_hash, given, 'x', special_comparison, given_hashes) and
+                _same_data(correct_ys, ys_hash, given, 'y', special_comparison, given_hashes))
 
 
 def describe_data(given, with_x=False):
@@ -155,6 +227,10 @@ def describe_data(given, with_x=False):
         return [given['x'], given['y']]
 
 
+def describe_plots(plots, with_x=False):
+    return [describe_data(a_plot, with_x) for a_plot in plots]
+
+
 GRAPH_TYPES = {'line': 'line plot',
                'hist': 'histogram',
                'scatter': 'scatter plot'}
@@ -175,6 +251,36 @@ def get_diff(expected, actual, format):
             "\n".join(format.python_value(repr(a)) for a in actual))
 
 
+class LazyDiff:
+    """
+    Stand-in for the result of :func:`get_diff` that only renders the data
+    when the message is actually formatted. Only some plot feedbacks show the
+    diff, so the others never pay for ``repr`` of potentially long data.
+    """
+    def __init__(self, expected, actual, format):
+        self.expected = expected
+        self.actual = actual
+        self.format = format
+        self._text = None
+
+    def __str__(self):
+        if self._text is None:
+            self._text = get_diff(self.expected, self.actual, self.format)
+        return self._text
+
+    def __repr__(self):
+        return repr(str(self))
+
+    def __eq__(self, other):
+        return str(self) == other
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def to_json(self):
+        return str(self)
+
+
 class BadGraphFeedback(FeedbackResponse):
     category = Feedback.CATEGORIES.SPECIFICATION
     valence = Feedback.NEGATIVE_VALENCE
@@ -185,7 +291,7 @@ class BadGraphFeedback(FeedbackResponse):
         fields['plt_type'] = plt_type
         fields['expected'] = expected
         fields['actual'] = actual
-        fields['diff_message'] = get_diff(expected, actual, report.format)
+        fields['diff_message'] = LazyDiff(expected, actual, report.format)
         fields['context'] = context
         if is_sandbox_result(context):
             context_id = context._actual_context_id
@@ -240,18 +346,23 @@ def assert_plot(plt_type, data, context=None, special_comparison=None, **kwargs)
     # Check the plots to see if there is a plot with the data
     type_found = False
     data_found = False
-    plots = get_sandbox(report=report).modules.plotting.plots
+    plotting = get_sandbox(report=report).modules.plotting
+    plots = plotting.plots
     appropriate_plots = []
+    correct_hashes = hash_correct_data(plt_type, data) if special_comparison is None else None
+    given_hashes = _GIVEN_HASHES.setdefault(plotting, {}) if correct_hashes else None
     for graph in plots:
         for a_plot in graph['data']:
-            data_found_here = compare_data(plt_type, data, a_plot, special_comparison=special_comparison)
+            data_found_here = compare_data(plt_type, data, a_plot, special_comparison=special_comparison,
+                                           correct_hashes=correct_hashes, given_hashes=given_hashes)
             expected_two_lists = isinstance(data, (tuple, list))
             had_x_values = 'x' in a_plot
             if a_plot['type'] == plt_type and data_found_here:
                 return False
             if a_plot['type'] == plt_type:
                 type_found = True
-                appropriate_plots.append(describe_data(a_plot, not expected_two_lists))
+                # Only described if we end up reporting wrong data
+                appropriate_plots.append(a_plot)
                 incompatible_plot_amounts = had_x_values and not expected_two_lists
             if data_found_here:
                 data_found = data_found_here
@@ -260,9 +371,11 @@ def assert_plot(plt_type, data, context=None, special_comparison=None, **kwargs)
     if type_found and data_found:
         return other_plt(plt_type, data, data_found)
     elif plt_type == 'line' and type_found and not data_found and incompatible_plot_amounts:
-        return wrong_plt_data(plt_type, data, appropriate_plots, context=context)
+        return wrong_plt_data(plt_type, data, describe_plots(appropriate_plots, not expected_two_lists),
+                              context=context)
     elif type_found:
-        return wrong_plt_data(plt_type, data, appropriate_plots, context=context)
+        return wrong_plt_data(plt_type, data, describe_plots(appropriate_plots, not expected_two_lists),
+                              context=context)
     elif data_found:
         return wrong_plt_type(plt_type, data, data_found)
     else:
@@ -0,0 +1,15 @@
+"""
+Carregamento único do arquivo .env
+Compartilhado pelos scripts do pipeline para não reprocessar o .env a cada import
+"""
+
+import functools
+
+
+@functools.cache
+def ensure_env_loaded() -> bool:
+    """Carrega o .env na primeira chamada; as seguintes não fazem nada"""
+    from dotenv import load_dotenv
+    
+    load_dotenv()
+    return True
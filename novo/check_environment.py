@@ -8,11 +8,13 @@ Verifica se tudo está configurado corretamente antes de executar o pipeline
 import os
 import sys
 import json
+from importlib.util import find_spec
 from pathlib import Path
-from dotenv import load_dotenv
+from _env import ensure_env_loaded
 
 def check_directories():
     """Verifica e cria diretórios necessários"""
+    lines = []
     required_dirs = [
         "output",
         "logs", 
@@ -22,17 +24,23 @@ def check_directories():
         "data"
     ]
     
-    print("📁 Verificando diretórios...")
+    lines.append("📁 Verificando diretórios...")
+    # Uma única leitura do diretório atual em vez de um stat por item
+    with os.scandir('.') as entries:
+        existing = {entry.name for entry in entries if entry.is_dir()}
+    
     for dir_name in required_dirs:
-        dir_path = Path(dir_name)
-        if not dir_path.exists():
-            dir_path.mkdir(parents=True, exist_ok=True)
-            print(f"  ✅ Criado: {dir_name}")
+        if dir_name in existing:
+            lines.append(f"  ✓ Existe: {dir_name}")
         else:
-            print(f"  ✓ Existe: {dir_name}")
+            os.makedirs(dir_name, exist_ok=True)
+            lines.append(f"  ✅ Criado: {dir_name}")
+    
+    return lines
 
 def check_files():
     """Verifica arquivos essenciais"""
+    lines = []
     required_files = [
         "pipeline_integrado.py",
         "drive_uploader.py", 
@@ -40,19 +48,24 @@ def check_files():
         ".env.example"
     ]
     
-    print("\n📄 Verificando arquivos essenciais...")
+    lines.append("\n📄 Verificando arquivos essenciais...")
+    with os.scandir('.') as entries:
+        existing = {entry.name for entry in entries if entry.is_file()}
+    
     for file_name in required_files:
-        file_path = Path(file_name)
-        if file_path.exists():
-            print(f"  ✓ Existe: {file_name}")
+        if file_name in existing:
+            lines.append(f"  ✓ Existe: {file_name}")
         else:
-            print(f"  ❌ Faltando: {file_name}")
+            lines.append(f"  ❌ Faltando: {file_name}")
+    
+    return lines
 
 def check_environment():
     """Verifica variáveis de ambiente"""
-    load_dotenv()
+    lines = []
+    ensure_env_loaded()
     
-    print("\n🔐 Verificando configuração...")
+    lines.append("\n🔐 Verificando configuração...")
     
     env_vars = {
         "GEMINI_API_KEY": "Chave do Gemini AI",
@@ -63,31 +76,46 @@ def check_environment():
     for var, description in env_vars.items():
         value = os.getenv(var)
         if value:
-            print(f"  ✓ {var}: Configurado")
+            lines.append(f"  ✓ {var}: Configurado")
         else:
-            print(f"  ⚠️  {var}: Não configurado ({description})")
+            lines.append(f"  ⚠️  {var}: Não configurado ({description})")
+    
+    return lines
 
 def check_credentials():
     """Verifica arquivos de credenciais"""
-    print("\n🗝️  Verificando credenciais...")
+    lines = []
+    lines.append("\n🗝️  Verificando credenciais...")
     
     creds_file = Path("google-drive-credentials.json")
     if creds_file.exists():
         try:
-            with open(creds_file, 'r') as f:
-                data = json.load(f)
-                if 'client_id' in str(data):
-                    print("  ✓ google-drive-credentials.json: Válido")
-                else:
-                    print("  ❌ google-drive-credentials.json: Formato inválido")
+            raw = creds_file.read_bytes()
+            # Sonda barata nos bytes antes de fazer o parse completo
+            valid = b'"client_id"' in raw
+            if valid:
+                data = json.loads(raw)
+                # client_id no topo (service account) ou em "installed"/"web" (OAuth)
+                valid = isinstance(data, dict) and (
+                    'client_id' in data
+                    or any(isinstance(v, dict) and 'client_id' in v for v in data.values())
+                )
+            
+            if valid:
+                lines.append("  ✓ google-drive-credentials.json: Válido")
+            else:
+                lines.append("  ❌ google-drive-credentials.json: Formato inválido")
         except json.JSONDecodeError:
-            print("  ❌ google-drive-credentials.json: JSON inválido")
+            lines.append("  ❌ google-drive-credentials.json: JSON inválido")
     else:
-        print("  ⚠️  google-drive-credentials.json: Não encontrado")
+        lines.append("  ⚠️  google-drive-credentials.json: Não encontrado")
+    
+    return lines
 
 def check_dependencies():
     """Verifica dependências Python"""
-    print("\n📦 Verificando dependências...")
+    lines = []
+    lines.append("\n📦 Verificando dependências...")
     
     required_packages = [
         "google-generativeai",
@@ -99,28 +127,32 @@ def check_dependencies():
     ]
     
     for package in required_packages:
-        try:
-            __import__(package.replace('-', '_'))
-            print(f"  ✓ {package}: Instalado")
-        except ImportError:
-            print(f"  ❌ {package}: Não instalado")
+        # find_spec só localiza o módulo, sem executar sua inicialização
+        if find_spec(package.replace('-', '_')) is not None:
+            lines.append(f"  ✓ {package}: Instalado")
+        else:
+            lines.append(f"  ❌ {package}: Não instalado")
+    
+    return lines
 
 def main():
     """Função principal"""
-    print("🔍 VERIFICAÇÃO DE AMBIENTE DO PIPELINE\n")
-    
-    check_directories()
-    check_files()
-    check_environment() 
-    check_credentials()
-    check_dependencies()
-    
-    print("\n" + "="*50)
-    print("💡 PRÓXIMOS PASSOS:")
-    print("1. Configure o arquivo .env com suas credenciais")
-    print("2. Adicione google-drive-credentials.json")
-    print("3. Execute: python3 pipeline_integrado.py")
-    print("="*50)
+    # Relatório montado em memória e emitido numa única escrita
+    report = [
+        "🔍 VERIFICAÇÃO DE AMBIENTE DO PIPELINE\n",
+        *check_directories(),
+        *check_files(),
+        *check_environment(),
+        *check_credentials(),
+        *check_dependencies(),
+        "\n" + "="*50,
+        "💡 PRÓXIMOS PASSOS:",
+        "1. Configure o arquivo .env com suas credenciais",
+        "2. Adicione google-drive-credentials.json",
+        "3. Execute: python3 pipeline_integrado.py",
+        "="*50
+    ]
+    sys.stdout.write("\n".join(report) + "\n")
 
 if __name__ == "__main__":
     main()
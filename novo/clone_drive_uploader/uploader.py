@@ -1,8 +1,21 @@
 import os
 import json
+from io import BytesIO
+from pathlib import Path
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
+from googleapiclient.http import MediaFileUpload, MediaIoBaseUpload
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional; o json da stdlib funciona igual
+    orjson = None
+
+
+def _load_json(path):
+    """Lê um arquivo JSON, usando orjson quando disponível."""
+    raw = Path(path).read_bytes()
+    return orjson.loads(raw) if orjson else json.loads(raw)
 
 def upload_to_drive():
     """Upload de arquivos para o Google Drive."""
@@ -14,13 +27,9 @@ def upload_to_drive():
         print("Erro: Credenciais do Google não encontradas!")
         return
     
-    # Escrever as credenciais em um arquivo temporário
-    with open('temp_credentials.json', 'w') as f:
-        f.write(credentials_json)
-    
-    # Autenticar
-    credentials = service_account.Credentials.from_service_account_file(
-        'temp_credentials.json',
+    # Autenticar direto da variável de ambiente, sem gravar credenciais em disco
+    credentials = service_account.Credentials.from_service_account_info(
+        json.loads(credentials_json),
         scopes=['https://www.googleapis.com/auth/drive']
     )
     
@@ -28,8 +37,7 @@ def upload_to_drive():
     drive_service = build('drive', 'v3', credentials=credentials)
     
     # Carregar roteiros para determinar o que fazer upload
-    with open('data/scripts.json', 'r') as f:
-        scripts = json.load(f)
+    scripts = _load_json('data/scripts.json')
     
     for i, script in enumerate(scripts):
         # Criar pasta para o projeto
@@ -44,14 +52,11 @@ def upload_to_drive():
         
         print(f"Criada pasta: {folder_name} (ID: {folder_id})")
         
-        # Upload do roteiro
-        script_path = f"data/final/script_{i}.txt"
-        
-        # Escrever o roteiro em um arquivo
-        with open(script_path, 'w') as f:
-            f.write(f"ROTEIRO: {script['topic']}\n\n")
-            for ts in script['timestamps']:
-                f.write(f"[{ts['start']:.1f}-{ts['end']:.1f}] {ts['text']}\n")
+        # Montar o roteiro em memória (sem arquivo intermediário em disco)
+        body = ''.join([
+            f"ROTEIRO: {script['topic']}\n\n",
+            *(f"[{ts['start']:.1f}-{ts['end']:.1f}] {ts['text']}\n" for ts in script['timestamps'])
+        ])
         
         # Upload para o Drive
         file_metadata = {
@@ -59,7 +64,11 @@ def upload_to_drive():
             'parents': [folder_id]
         }
         
-        media = MediaFileUpload(script_path, mimetype='text/plain')
+        media = MediaIoBaseUpload(
+            BytesIO(body.encode('utf-8')),
+            mimetype='text/plain',
+            resumable=False
+        )
         file = drive_service.files().create(
             body=file_metadata,
             media_body=media,
@@ -84,8 +93,6 @@ def upload_to_drive():
         #        ).execute()
         #        print(f"Imagem {j} enviada: {file.get('id')}")
     
-    # Remover arquivo de credenciais temporário
-    os.remove('temp_credentials.json')
     print("Upload para o Drive concluído com sucesso!")
 
 if __name__ == "__main__":
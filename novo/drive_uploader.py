@@ -8,19 +8,26 @@ Baseado no clonedriveuploader com melhorias de segurança e funcionalidade
 import os
 import sys
 import json
+import mmap
+import hashlib
 import logging
+import contextlib
+import mimetypes
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Optional, List, Dict, Any
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
-from googleapiclient.errors import HttpError
-import pickle
 
-# Configuração de logging
-logging.basicConfig(level=logging.INFO)
+from _env import ensure_env_loaded
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional; o json da stdlib funciona igual
+    orjson = None
+
+# Logger do módulo (a configuração fica a cargo de quem executa)
 logger = logging.getLogger(__name__)
 
 # Escopos necessários para o Google Drive
@@ -29,23 +36,139 @@ SCOPES = [
     'https://www.googleapis.com/auth/drive.file'
 ]
 
+# Tipos MIME por extensão
+_MIME_TYPES = {
+    '.txt': 'text/plain',
+    '.py': 'text/x-python',
+    '.json': 'application/json',
+    '.mp3': 'audio/mpeg',
+    '.wav': 'audio/wav',
+    '.mp4': 'video/mp4',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.gif': 'image/gif'
+}
+
+# Mapear tipos de arquivo para subpastas
+_FOLDER_MAPPING = {
+    'scripts': ['.py', '.txt', '.md'],
+    'audio': ['.mp3', '.wav', '.m4a'],
+    'images': ['.jpg', '.jpeg', '.png', '.gif'],
+    'videos': ['.mp4', '.avi', '.mov'],
+    'data': ['.json', '.csv', '.xml']
+}
+
+# Índice invertido extensão -> subpasta
+_EXTENSION_TO_FOLDER = {
+    ext: folder for folder, exts in _FOLDER_MAPPING.items() for ext in exts
+}
+
+# Uploads simultâneos em upload_directory (limitado pela cota da Drive API).
+# DRIVE_UPLOAD_WORKERS sobrescreve; lido em DriveUploader.__init__, depois do .env
+MAX_UPLOAD_WORKERS = 8
+
+# Teto de requisições por segundo somando todas as threads (0 = sem limite).
+# DRIVE_MAX_REQUESTS_PER_SECOND sobrescreve; lido junto com o anterior
+MAX_REQUESTS_PER_SECOND = 10.0
+
+# Arquivos menores que isso vão numa única requisição (sem sessão resumable)
+RESUMABLE_THRESHOLD = 5 * 1024 * 1024
+# Tamanho de cada PUT no upload resumable (múltiplo de 256 KB)
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Manifesto local salvo no diretório enviado: caminho -> (mtime_ns, size, sha256,
+# id no Drive) e sha256 -> id no Drive. Num reenvio para a mesma pasta do projeto,
+# arquivo com stat igual não é relido nem reescrito (só um files.get confirma que
+# ele continua lá); arquivo alterado substitui o anterior via files.update.
+UPLOAD_CACHE_NAME = '.drive_upload_cache.json'
+# Manifesto e seus temporários de escrita atômica (nunca enviados ao Drive)
+_UPLOAD_CACHE_PREFIX = '.drive_upload_cache.'
+
+# Tentativas por bloco antes de desistir de um upload resumable
+CHUNK_RETRIES = 3
+
+# Máximo de chamadas num BatchHttpRequest aceito pela Drive API
+BATCH_MAX_REQUESTS = 100
+
+# Timeout (s) das conexões HTTP com a Drive API
+HTTP_TIMEOUT = 30
+
+def _json_loads(raw: bytes) -> Any:
+    """Faz o parse de JSON, usando orjson quando disponível"""
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+def _json_dumps(data: Any, indent: bool = False) -> bytes:
+    """Serializa para bytes UTF-8, usando orjson quando disponível"""
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(data, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
+
+def _build_drive_service(credentials):
+    """Cria o service da Drive API usando o documento de discovery empacotado"""
+    import httplib2
+    from google_auth_httplib2 import AuthorizedHttp
+    from googleapiclient.discovery import build
+    
+    # Um Http persistente mantém a conexão TLS aberta entre as chamadas
+    authed_http = AuthorizedHttp(credentials, http=httplib2.Http(timeout=HTTP_TIMEOUT))
+    
+    # static_discovery evita o download do discovery document a cada build()
+    return build('drive', 'v3', http=authed_http,
+                 cache_discovery=False, static_discovery=True)
+
+class _RateLimiter:
+    """Espaça as requisições para não passar de `rate` por segundo entre threads"""
+    
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+    
+    def wait(self):
+        if not self._interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self._interval
+        if delay > 0:
+            time.sleep(delay)
+
 class DriveUploader:
     """Sistema robusto de upload para Google Drive"""
     
     def __init__(self, credentials_path: str = "google-drive-credentials.json"):
+        ensure_env_loaded()
+        # Lidos só agora: no import o .env ainda não foi carregado
+        self.upload_workers = int(os.getenv('DRIVE_UPLOAD_WORKERS', MAX_UPLOAD_WORKERS))
+        self.max_requests_per_second = float(
+            os.getenv('DRIVE_MAX_REQUESTS_PER_SECOND', MAX_REQUESTS_PER_SECOND)
+        )
         self.credentials_path = Path(credentials_path)
-        self.token_path = Path("token.pickle")
+        self.token_path = Path("token.json")
         self.service = None
+        self._credentials = None
+        # O transporte httplib2 não é thread-safe: um service por thread
+        self._local = threading.local()
+        self._cache_lock = threading.Lock()
+        self._rate_limiter = _RateLimiter(self.max_requests_per_second)
         self._authenticate()
     
     def _authenticate(self):
         """Autentica com o Google Drive API"""
+        # Imports pesados do cliente Google só quando o uploader é instanciado
+        from google.oauth2.credentials import Credentials
+        from google_auth_oauthlib.flow import InstalledAppFlow
+        from google.auth.transport.requests import Request
+        
         creds = None
         
-        # Carregar token salvo se existir
-        if self.token_path.exists():
-            with open(self.token_path, 'rb') as token:
-                creds = pickle.load(token)
+        # Carregar token salvo se existir e se as credenciais não mudaram depois dele
+        if self.token_path.exists() and not self._credentials_changed():
+            creds = Credentials.from_authorized_user_info(
+                _json_loads(self.token_path.read_bytes()), SCOPES
+            )
         
         # Se não há credenciais válidas, fazer login
         if not creds or not creds.valid:
@@ -53,7 +176,7 @@ class DriveUploader:
                 try:
                     creds.refresh(Request())
                 except Exception as e:
-                    logger.warning(f"Erro ao renovar token: {e}")
+                    logger.warning("Erro ao renovar token: %s", e)
                     creds = None
             
             if not creds:
@@ -69,14 +192,33 @@ class DriveUploader:
                 creds = flow.run_local_server(port=0)
             
             # Salvar credenciais para próxima execução
-            with open(self.token_path, 'wb') as token:
-                pickle.dump(creds, token)
+            with open(self.token_path, 'w') as token:
+                token.write(creds.to_json())
         
-        self.service = build('drive', 'v3', credentials=creds)
+        self._credentials = creds
+        self.service = _build_drive_service(creds)
+        self._local.service = self.service
         logger.info("✅ Autenticação com Google Drive realizada com sucesso")
     
+    def _credentials_changed(self) -> bool:
+        """Indica se o arquivo de credenciais foi alterado após o último token salvo"""
+        try:
+            return self.credentials_path.stat().st_mtime > self.token_path.stat().st_mtime
+        except FileNotFoundError:
+            return False
+    
+    def _get_service(self):
+        """Retorna o service da thread atual, criando-o se necessário"""
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            service = _build_drive_service(self._credentials)
+            self._local.service = service
+        return service
+    
     def create_folder(self, folder_name: str, parent_id: Optional[str] = None) -> str:
         """Cria uma pasta no Google Drive"""
+        from googleapiclient.errors import HttpError
+        
         try:
             folder_metadata = {
                 'name': folder_name,
@@ -94,58 +236,197 @@ class DriveUploader:
             folder_id = folder.get('id')
             folder_url = folder.get('webViewLink')
             
-            logger.info(f"✅ Pasta criada: {folder_name} (ID: {folder_id})")
+            logger.info("✅ Pasta criada: %s (ID: %s)", folder_name, folder_id)
             return folder_id, folder_url
             
         except HttpError as e:
             logger.error(f"❌ Erro ao criar pasta {folder_name}: {e}")
             raise
     
+    def _find_folder(self, folder_name: str, parent_id: Optional[str] = None) -> Optional[tuple]:
+        """Procura uma pasta pelo nome dentro de parent_id (raiz do Drive se None): (id, url)"""
+        from googleapiclient.errors import HttpError
+        
+        escaped_name = folder_name.replace('\\', '\\\\').replace("'", "\\'")
+        query = (
+            f"name = '{escaped_name}' and '{parent_id or 'root'}' in parents and "
+            "mimeType='application/vnd.google-apps.folder' and trashed=false"
+        )
+        try:
+            response = self.service.files().list(
+                q=query,
+                fields='files(id,webViewLink)',
+                pageSize=1
+            ).execute()
+        except HttpError as e:
+            logger.error(f"❌ Erro ao procurar pasta {folder_name}: {e}")
+            raise
+        
+        files = response.get('files', [])
+        if not files:
+            return None
+        return files[0]['id'], files[0].get('webViewLink')
+    
+    def _list_children_folders(self, parent_id: str) -> Dict[str, tuple]:
+        """Lista as subpastas de parent_id numa única consulta: {nome: (id, url)}"""
+        from googleapiclient.errors import HttpError
+        
+        query = (
+            f"'{parent_id}' in parents and "
+            "mimeType='application/vnd.google-apps.folder' and trashed=false"
+        )
+        folders = {}
+        params = {'q': query, 'fields': 'nextPageToken, files(id,name,webViewLink)'}
+        try:
+            while True:
+                response = self.service.files().list(**params).execute()
+                for folder in response.get('files', []):
+                    folders.setdefault(folder['name'], (folder['id'], folder.get('webViewLink')))
+                next_page = response.get('nextPageToken')
+                if not next_page:
+                    return folders
+                params['pageToken'] = next_page
+        except HttpError as e:
+            logger.error(f"❌ Erro ao listar pastas de {parent_id}: {e}")
+            raise
+    
+    def create_folders_batch(self, folder_names: List[str],
+                             parent_id: Optional[str] = None) -> Dict[str, tuple]:
+        """Cria várias pastas em lote (BatchHttpRequest, até 100 por requisição)"""
+        from googleapiclient.errors import HttpError
+        
+        created = {}
+        errors = {}
+        
+        def on_folder_created(request_id, response, exception):
+            if exception is not None:
+                errors[request_id] = exception
+            else:
+                created[request_id] = (response.get('id'), response.get('webViewLink'))
+        
+        try:
+            for start in range(0, len(folder_names), BATCH_MAX_REQUESTS):
+                batch = self.service.new_batch_http_request(callback=on_folder_created)
+                for folder_name in folder_names[start:start + BATCH_MAX_REQUESTS]:
+                    folder_metadata = {
+                        'name': folder_name,
+                        'mimeType': 'application/vnd.google-apps.folder'
+                    }
+                    if parent_id:
+                        folder_metadata['parents'] = [parent_id]
+                    
+                    batch.add(
+                        self.service.files().create(
+                            body=folder_metadata,
+                            fields='id,name,webViewLink'
+                        ),
+                        request_id=folder_name
+                    )
+                batch.execute()
+        except HttpError as e:
+            logger.error(f"❌ Erro ao criar pastas em lote: {e}")
+            raise
+        
+        if errors:
+            for folder_name, error in errors.items():
+                logger.error(f"❌ Erro ao criar pasta {folder_name}: {error}")
+            raise next(iter(errors.values()))
+        
+        for folder_name, (folder_id, _) in created.items():
+            logger.info("✅ Pasta criada: %s (ID: %s)", folder_name, folder_id)
+        
+        return created
+    
     def upload_file(self, file_path: Path, folder_id: Optional[str] = None, 
-                   description: str = "") -> Dict[str, Any]:
-        """Upload de um arquivo para o Google Drive"""
+                   description: str = "", file_id: Optional[str] = None) -> Dict[str, Any]:
+        """Upload de um arquivo para o Google Drive
+        
+        Com file_id, substitui o conteúdo desse arquivo (files.update) em vez
+        de criar um novo ao lado dele
+        """
+        from googleapiclient.http import MediaFileUpload, MediaIoBaseUpload
+        from googleapiclient.errors import HttpError
+        
+        # Atributos do caminho calculados uma única vez
+        file_path = file_path if isinstance(file_path, Path) else Path(file_path)
+        name = file_path.name
+        
         try:
-            if not file_path.exists():
-                raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
+            try:
+                size = file_path.stat().st_size
+            except FileNotFoundError:
+                raise FileNotFoundError(f"Arquivo não encontrado: {file_path}") from None
             
             # Metadados do arquivo
             file_metadata = {
-                'name': file_path.name,
+                'name': name,
                 'description': description
             }
             
-            if folder_id:
+            # files.update não aceita parents no corpo: o arquivo continua onde está
+            if folder_id and not file_id:
                 file_metadata['parents'] = [folder_id]
             
             # Determinar tipo MIME
             mime_type = self._get_mime_type(file_path)
             
-            # Upload do arquivo
-            media = MediaFileUpload(
-                str(file_path),
-                mimetype=mime_type,
-                resumable=True
-            )
-            
-            file = self.service.files().create(
-                body=file_metadata,
-                media_body=media,
-                fields='id,name,webViewLink,size'
-            ).execute()
+            # Upload do arquivo: simples para arquivos pequenos, resumable em blocos grandes
+            resumable = size >= RESUMABLE_THRESHOLD
+            with contextlib.ExitStack() as stack:
+                if resumable:
+                    # Arquivo mapeado em memória: os blocos saem do page cache,
+                    # sem buffer intermediário de leitura
+                    f = stack.enter_context(open(file_path, 'rb'))
+                    mapped = stack.enter_context(
+                        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    )
+                    media = MediaIoBaseUpload(
+                        mapped,
+                        mimetype=mime_type,
+                        chunksize=UPLOAD_CHUNK_SIZE,
+                        resumable=True
+                    )
+                else:
+                    media = MediaFileUpload(
+                        str(file_path),
+                        mimetype=mime_type,
+                        resumable=False,
+                        chunksize=-1
+                    )
+                
+                self._rate_limiter.wait()
+                files = self._get_service().files()
+                if file_id:
+                    request = files.update(
+                        fileId=file_id,
+                        body=file_metadata,
+                        media_body=media,
+                        fields='id,name,webViewLink,size'
+                    )
+                else:
+                    request = files.create(
+                        body=file_metadata,
+                        media_body=media,
+                        fields='id,name,webViewLink,size'
+                    )
+                
+                if resumable:
+                    # Envio bloco a bloco: uma falha repete só o bloco, não o arquivo todo
+                    file = None
+                    while file is None:
+                        status, file = request.next_chunk(num_retries=CHUNK_RETRIES)
+                        if status:
+                            logger.debug("⬆️ %s: %d%%", name, int(status.progress() * 100))
+                else:
+                    file = request.execute()
             
-            result = {
-                'id': file.get('id'),
-                'name': file.get('name'),
-                'url': file.get('webViewLink'),
-                'size': file.get('size'),
-                'local_path': str(file_path)
-            }
+            result = self._file_info(file, str(file_path))
             
-            logger.info(f"✅ Upload concluído: {file_path.name}")
+            logger.info("✅ Upload concluído: %s", name)
             return result
             
         except HttpError as e:
-            logger.error(f"❌ Erro no upload de {file_path.name}: {e}")
+            logger.error(f"❌ Erro no upload de {name}: {e}")
             raise
         except Exception as e:
             logger.error(f"❌ Erro inesperado no upload: {e}")
@@ -157,8 +438,13 @@ class DriveUploader:
             if not directory.exists() or not directory.is_dir():
                 raise ValueError(f"Diretório inválido: {directory}")
             
-            # Criar pasta principal do projeto
-            main_folder_id, main_folder_url = self.create_folder(project_name)
+            # Reaproveitar a pasta do projeto de um envio anterior, ou criar uma nova
+            existing_folder = self._find_folder(project_name)
+            if existing_folder:
+                main_folder_id, main_folder_url = existing_folder
+                logger.info("📁 Pasta existente reaproveitada: %s (ID: %s)", project_name, main_folder_id)
+            else:
+                main_folder_id, main_folder_url = self.create_folder(project_name)
             
             # Estrutura para organizar uploads
             uploaded_files = {
@@ -169,52 +455,57 @@ class DriveUploader:
                 'subfolders': {}
             }
             
-            # Mapear tipos de arquivo para subpastas
-            folder_mapping = {
-                'scripts': ['.py', '.txt', '.md'],
-                'audio': ['.mp3', '.wav', '.m4a'],
-                'images': ['.jpg', '.jpeg', '.png', '.gif'],
-                'videos': ['.mp4', '.avi', '.mov'],
-                'data': ['.json', '.csv', '.xml']
-            }
-            
-            # Criar subpastas
-            for folder_name in folder_mapping.keys():
-                subfolder_id, subfolder_url = self.create_folder(
-                    folder_name.capitalize(), 
-                    main_folder_id
-                )
+            # Reaproveitar subpastas existentes (pasta nova não tem nenhuma) e criar as demais em lote
+            subfolders = self._list_children_folders(main_folder_id) if existing_folder else {}
+            missing = [
+                folder_name.capitalize() for folder_name in _FOLDER_MAPPING
+                if folder_name.capitalize() not in subfolders
+            ]
+            if missing:
+                subfolders.update(self.create_folders_batch(missing, main_folder_id))
+            for folder_name in _FOLDER_MAPPING:
+                subfolder_id, subfolder_url = subfolders[folder_name.capitalize()]
                 uploaded_files['subfolders'][folder_name] = {
                     'id': subfolder_id,
                     'url': subfolder_url,
                     'files': []
                 }
             
-            # Upload de todos os arquivos
-            for file_path in directory.rglob('*'):
-                if file_path.is_file():
-                    # Determinar pasta de destino
-                    target_folder = self._determine_target_folder(
-                        file_path, folder_mapping
-                    )
-                    
-                    folder_id = uploaded_files['subfolders'][target_folder]['id']
-                    
-                    # Upload do arquivo
-                    file_info = self.upload_file(
-                        file_path, 
-                        folder_id,
-                        f"Arquivo do projeto {project_name}"
-                    )
+            # Fase 1: mapear cada arquivo para sua pasta de destino
+            jobs = [
+                (entry, self._determine_target_folder(Path(entry.name)))
+                for entry in self._scandir_files(directory)
+            ]
+            
+            # Fase 2: uploads independentes em paralelo (pulando arquivos já enviados)
+            description = f"Arquivo do projeto {project_name}"
+            cache = self._load_upload_cache(directory)
+            try:
+                with ThreadPoolExecutor(max_workers=self.upload_workers) as executor:
+                    futures = {
+                        executor.submit(
+                            self._upload_file_cached,
+                            entry,
+                            os.path.relpath(entry.path, directory),
+                            uploaded_files['subfolders'][target_folder]['id'],
+                            description,
+                            cache
+                        ): target_folder
+                        for entry, target_folder in jobs
+                    }
                     
-                    uploaded_files['subfolders'][target_folder]['files'].append(file_info)
-                    uploaded_files['files'].append(file_info)
+                    for future in as_completed(futures):
+                        file_info = future.result()
+                        uploaded_files['subfolders'][futures[future]]['files'].append(file_info)
+                        uploaded_files['files'].append(file_info)
+            finally:
+                self._save_upload_cache(directory, cache)
             
             # Salvar informações do upload
             self._save_upload_info(directory, uploaded_files)
             
-            logger.info(f"✅ Upload completo do projeto: {project_name}")
-            logger.info(f"📁 URL da pasta: {main_folder_url}")
+            logger.info("✅ Upload completo do projeto: %s", project_name)
+            logger.info("📁 URL da pasta: %s", main_folder_url)
             
             return uploaded_files
             
@@ -222,33 +513,169 @@ class DriveUploader:
             logger.error(f"❌ Erro no upload do diretório: {e}")
             raise
     
-    def _get_mime_type(self, file_path: Path) -> str:
-        """Determina o tipo MIME do arquivo"""
-        mime_types = {
-            '.txt': 'text/plain',
-            '.py': 'text/x-python',
-            '.json': 'application/json',
-            '.mp3': 'audio/mpeg',
-            '.wav': 'audio/wav',
-            '.mp4': 'video/mp4',
-            '.jpg': 'image/jpeg',
-            '.jpeg': 'image/jpeg',
-            '.png': 'image/png',
-            '.gif': 'image/gif'
+    def _upload_file_cached(self, entry: os.DirEntry, rel_path: str, folder_id: str,
+                            description: str, cache: Dict[str, Dict]) -> Dict[str, Any]:
+        """Envia o arquivo só quando o Drive ainda não tem este conteúdo neste lugar
+        
+        - hash conhecido e arquivo já na pasta com o mesmo nome: nada é escrito
+        - arquivo já enviado antes deste caminho: conteúdo substituído (files.update)
+        - hash conhecido em outra pasta: cópia no servidor (files.copy)
+        - caso contrário: upload novo
+        """
+        # DirEntry guarda o resultado do stat: nenhuma chamada extra depois desta
+        stat = entry.stat()
+        with self._cache_lock:
+            known = cache['stats'].get(rel_path)
+        
+        # mtime e tamanho iguais: reaproveitar o hash sem reler o arquivo
+        if known and known['mtime_ns'] == stat.st_mtime_ns and known['size'] == stat.st_size:
+            digest = known['sha256']
+        else:
+            with open(entry.path, 'rb') as f:
+                digest = hashlib.file_digest(f, 'sha256').hexdigest()
+        
+        with self._cache_lock:
+            cached_id = cache['hashes'].get(digest)
+        previous_id = known.get('file_id') if known else None
+        
+        def in_folder(file):
+            return file is not None and folder_id in file.get('parents', [])
+        
+        file_info = None
+        cached_file = self._get_drive_file(cached_id) if cached_id else None
+        if in_folder(cached_file) and cached_file.get('name') == entry.name:
+            logger.info("♻️ Já está no Drive: %s", entry.name)
+            file_info = self._file_info(cached_file, entry.path)
+        
+        if file_info is None and previous_id:
+            previous_file = cached_file if previous_id == cached_id else self._get_drive_file(previous_id)
+            if in_folder(previous_file):
+                file_info = self.upload_file(entry.path, folder_id, description, file_id=previous_id)
+        
+        if file_info is None and cached_file is not None:
+            file_info = self._copy_cached_file(cached_id, entry.name, entry.path,
+                                               folder_id, description)
+        if file_info is None:
+            file_info = self.upload_file(entry.path, folder_id, description)
+        
+        with self._cache_lock:
+            cache['stats'][rel_path] = {
+                'mtime_ns': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'sha256': digest,
+                'file_id': file_info['id']
+            }
+            cache['hashes'][digest] = file_info['id']
+        
+        return file_info
+    
+    def _copy_cached_file(self, file_id: str, name: str, local_path: str, folder_id: str,
+                          description: str) -> Optional[Dict[str, Any]]:
+        """Copia no servidor um arquivo já enviado; None se ele não existe mais"""
+        from googleapiclient.errors import HttpError
+        
+        try:
+            self._rate_limiter.wait()
+            file = self._get_service().files().copy(
+                fileId=file_id,
+                body={
+                    'name': name,
+                    'description': description,
+                    'parents': [folder_id]
+                },
+                fields='id,name,webViewLink,size'
+            ).execute()
+        except HttpError as e:
+            logger.warning("⚠️ Cache inválido para %s, reenviando: %s", name, e)
+            return None
+        
+        logger.info("♻️ Reaproveitado do cache: %s", name)
+        return self._file_info(file, local_path)
+    
+    def _get_drive_file(self, file_id: str) -> Optional[Dict[str, Any]]:
+        """Metadados de um arquivo já enviado; None se foi apagado ou está na lixeira"""
+        from googleapiclient.errors import HttpError
+        
+        try:
+            self._rate_limiter.wait()
+            file = self._get_service().files().get(
+                fileId=file_id,
+                fields='id,name,webViewLink,size,parents,trashed'
+            ).execute()
+        except HttpError as e:
+            logger.warning("⚠️ Arquivo do cache indisponível no Drive (%s): %s", file_id, e)
+            return None
+        return None if file.get('trashed') else file
+    
+    def _file_info(self, file: Dict[str, Any], local_path: str) -> Dict[str, Any]:
+        """Resumo de um arquivo do Drive no formato usado em upload_info"""
+        return {
+            'id': file.get('id'),
+            'name': file.get('name'),
+            'url': file.get('webViewLink'),
+            'size': file.get('size'),
+            'local_path': local_path
         }
+    
+    def _load_upload_cache(self, directory: Path) -> Dict[str, Dict]:
+        """Carrega o manifesto de uploads anteriores do diretório"""
+        try:
+            cache = _json_loads((directory / UPLOAD_CACHE_NAME).read_bytes())
+        except (FileNotFoundError, json.JSONDecodeError):
+            cache = {}
+        cache.setdefault('hashes', {})
+        cache.setdefault('stats', {})
+        return cache
+    
+    def _save_upload_cache(self, directory: Path, cache: Dict[str, Dict]):
+        """Grava o manifesto de forma atômica (arquivo temporário + os.replace)"""
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=_UPLOAD_CACHE_PREFIX)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(_json_dumps(cache))
+            os.replace(tmp_path, directory / UPLOAD_CACHE_NAME)
+        except OSError as e:
+            logger.warning("⚠️ Não foi possível salvar o cache de uploads: %s", e)
+    
+    def _scandir_files(self, directory: Path):
+        """Percorre o diretório com os.scandir, gerando os DirEntry dos arquivos
         
+        Mesmo conjunto de arquivos do antigo rglob('*') + is_file(): inclui
+        arquivos ocultos e links para arquivos, sem entrar em links para
+        diretórios. Só o manifesto de cache do próprio uploader fica de fora.
+        """
+        stack = [directory]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file() and not entry.name.startswith(_UPLOAD_CACHE_PREFIX):
+                        yield entry
+    
+    def _get_mime_type(self, file_path: Path) -> str:
+        """Determina o tipo MIME do arquivo pela extensão"""
         suffix = file_path.suffix.lower()
-        return mime_types.get(suffix, 'application/octet-stream')
+        # Tabela própria primeiro; mimetypes cobre as demais extensões (.m4a, .md, .csv...)
+        return (
+            _MIME_TYPES.get(suffix)
+            or mimetypes.guess_type(f"arquivo{suffix}", strict=False)[0]
+            or 'application/octet-stream'
+        )
     
-    def _determine_target_folder(self, file_path: Path, folder_mapping: Dict[str, List[str]]) -> str:
+    def _determine_target_folder(self, file_path: Path,
+                                 folder_mapping: Optional[Dict[str, List[str]]] = None) -> str:
         """Determina a pasta de destino baseada na extensão do arquivo"""
-        suffix = file_path.suffix.lower()
-        
-        for folder_name, extensions in folder_mapping.items():
-            if suffix in extensions:
-                return folder_name
+        if folder_mapping is None:
+            extension_to_folder = _EXTENSION_TO_FOLDER
+        else:
+            # Mapeamento customizado: a primeira pasta que lista a extensão vence
+            extension_to_folder = {}
+            for folder_name, extensions in folder_mapping.items():
+                for ext in extensions:
+                    extension_to_folder.setdefault(ext, folder_name)
         
-        return 'data'  # Pasta padrão
+        return extension_to_folder.get(file_path.suffix.lower(), 'data')  # Pasta padrão
     
     def _save_upload_info(self, directory: Path, upload_info: Dict[str, Any]):
         """Salva informações do upload em arquivos locais"""
@@ -260,26 +687,31 @@ class DriveUploader:
             
             # Salvar informações completas
             info_file = directory / "upload_info.json"
-            with open(info_file, 'w') as f:
-                json.dump(upload_info, f, indent=2, ensure_ascii=False)
+            info_file.write_bytes(_json_dumps(upload_info, indent=True))
             
-            logger.info(f"✅ Informações do upload salvas em {directory}")
+            logger.info("✅ Informações do upload salvas em %s", directory)
             
         except Exception as e:
-            logger.warning(f"⚠️ Não foi possível salvar informações do upload: {e}")
+            logger.warning("⚠️ Não foi possível salvar informações do upload: %s", e)
 
 def main():
     """Função principal para teste e uso direto"""
     import argparse
     
     parser = argparse.ArgumentParser(description='Upload para Google Drive')
-    parser.add_argument('--input-dir', required=True, help='Diretório para upload')
-    parser.add_argument('--project-name', required=True, help='Nome do projeto')
+    # O pipeline integrado passa diretório e projeto via PIPELINE_OUTPUT_DIR/PIPELINE_PROJECT_NAME
+    parser.add_argument('--input-dir', default=os.environ.get('PIPELINE_OUTPUT_DIR'),
+                        required='PIPELINE_OUTPUT_DIR' not in os.environ, help='Diretório para upload')
+    parser.add_argument('--project-name', default=os.environ.get('PIPELINE_PROJECT_NAME'),
+                        required='PIPELINE_PROJECT_NAME' not in os.environ, help='Nome do projeto')
     parser.add_argument('--credentials', default='google-drive-credentials.json', 
                        help='Arquivo de credenciais')
     
     args = parser.parse_args()
     
+    # Configuração de logging só na execução direta, não ao importar o módulo
+    logging.basicConfig(level=logging.INFO)
+    
     try:
         uploader = DriveUploader(args.credentials)
         result = uploader.upload_directory(Path(args.input_dir), args.project_name)
@@ -1,8 +1,15 @@
 #!/usr/bin/env python3
 import os
+import re
+import asyncio
 import sys
 import time
+import wave
+import hashlib
+import shutil
 import logging
+import functools
+import importlib
 import schedule
 from datetime import datetime
 from pathlib import Path
@@ -11,6 +18,12 @@ from dotenv import load_dotenv
 import requests
 import json
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional; o json da stdlib funciona igual
+    orjson = None
 
 # Configuração de logging
 logging.basicConfig(
@@ -32,10 +45,85 @@ OUTPUT_DIR = PROJECT_ROOT / "youtube_automation" / "output"
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 GOOGLE_APPLICATION_CREDENTIALS = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
 
+# Raízes dos módulos importados no próprio processo (configuráveis via .env).
+# Este script fica em novo/etc/systemd/system, então a raiz do novo está 3 níveis acima.
+NOVO_DIR = Path(os.getenv("NOVO_DIR", Path(__file__).resolve().parents[3]))
+YOUTUBE_AUTOMATION_ROOT = Path(os.getenv("YOUTUBE_AUTOMATION_ROOT", NOVO_DIR.parent / "clonedriveuploader"))
+
+# Padrões usados na análise do roteiro e da resposta do Gemini
+_TS_RE = re.compile(r'\[(\d+):(\d+)\]')
+_IMG_RE = re.compile(r'\(Imagem:?\s*(.*?)\)', re.IGNORECASE)
+_TOPICS_JSON_RE = re.compile(r'\[\s*\{.*\}\s*\]', re.DOTALL)
+
+def _import_from(root, module_name):
+    """Importa um módulo a partir de uma raiz explícita, registrando falhas de import"""
+    root = str(root)
+    if root not in sys.path:
+        sys.path.insert(0, root)
+    try:
+        return importlib.import_module(module_name)
+    except ImportError as e:
+        logger.error(f"Não foi possível importar {module_name} a partir de {root}: {e}")
+        raise
+
+
+def _json_loads(raw):
+    """Faz o parse de JSON, usando orjson quando disponível"""
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+
+def _json_dumps(data):
+    """Serializa com indentação para bytes UTF-8, usando orjson quando disponível"""
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _list_existing_files(paths):
+    """Retorna quais dos caminhos existem, com um os.scandir por diretório distinto"""
+    existing = set()
+    for directory in {os.path.dirname(path) for path in paths}:
+        try:
+            with os.scandir(directory or ".") as entries:
+                existing.update(
+                    os.path.join(directory, entry.name) for entry in entries if entry.is_file()
+                )
+        except FileNotFoundError:
+            continue
+    return existing
+
+
+def _script_hash(script):
+    """Impressão digital do roteiro (blake2b) para validar o cache de segmentos"""
+    return hashlib.blake2b(script.encode("utf-8")).hexdigest()
+
+
+def _concat_path(path):
+    """Caminho absoluto entre aspas simples, no formato do concat demuxer do FFmpeg"""
+    return "'" + os.path.abspath(path).replace("'", "'\\''") + "'"
+
+
+def _srt_time(seconds):
+    """Formata segundos como timestamp SRT (HH:MM:SS,mmm)"""
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+
+
+@functools.lru_cache(maxsize=1)
+def _placeholder_template():
+    """Imagem base e fonte dos placeholders, criadas uma única vez"""
+    from PIL import Image, ImageFont
+    return Image.new('RGB', (1280, 720), color=(73, 109, 137)), ImageFont.load_default()
+
+
 class PipelineAutomatizado:
     def __init__(self):
         """Inicializa o pipeline automatizado"""
         self.today = datetime.now().strftime("%Y-%m-%d")
+        self._drive = None  # DriveUploader criado no primeiro upload e reaproveitado
         self.configure_apis()
         
     def configure_apis(self):
@@ -51,7 +139,7 @@ class PipelineAutomatizado:
         if not os.path.exists(GOOGLE_APPLICATION_CREDENTIALS):
             logger.warning(f"Arquivo de credenciais GCP não encontrado: {GOOGLE_APPLICATION_CREDENTIALS}")
     
-    def discover_trending_topics(self):
+    async def discover_trending_topics(self):
         """Descobre tópicos em alta para criação de conteúdo"""
         logger.info("Descobrindo tópicos em alta...")
         
@@ -68,17 +156,16 @@ class PipelineAutomatizado:
             Formate sua resposta como uma lista JSON com os campos: title, description, e relevance.
             """
             
-            response = model.generate_content(prompt)
+            response = await model.generate_content_async(prompt)
             
             # Processar a resposta para extrair os tópicos
             content = response.text
             # Tentar encontrar conteúdo JSON na resposta
-            import re
-            json_match = re.search(r'\[\s*\{.*\}\s*\]', content, re.DOTALL)
+            json_match = _TOPICS_JSON_RE.search(content)
             
             if json_match:
                 topics_json = json_match.group(0)
-                topics = json.loads(topics_json)
+                topics = _json_loads(topics_json)
             else:
                 # Fallback: Estruturar manualmente
                 topics = [
@@ -93,8 +180,7 @@ class PipelineAutomatizado:
             topics_dir = OUTPUT_DIR / f"{self.today}_trending_topics"
             topics_dir.mkdir(exist_ok=True, parents=True)
             
-            with open(topics_dir / "topics.json", "w", encoding="utf-8") as f:
-                json.dump(topics, f, ensure_ascii=False, indent=2)
+            (topics_dir / "topics.json").write_bytes(_json_dumps(topics))
             
             logger.info(f"Descobertos {len(topics)} tópicos em alta")
             return topics
@@ -103,7 +189,7 @@ class PipelineAutomatizado:
             logger.error(f"Erro ao descobrir tópicos em alta: {e}")
             return []
     
-    def generate_script(self, topic):
+    async def generate_script(self, topic):
         """Gera um roteiro detalhado para o tópico"""
         logger.info(f"Gerando roteiro para: {topic['title']}")
         
@@ -125,7 +211,7 @@ class PipelineAutomatizado:
             [00:00] Olá, pessoal! Hoje vamos explorar os mistérios do folclore brasileiro. (Imagem: floresta amazônica ao anoitecer)
             """
             
-            response = model.generate_content(prompt)
+            response = await model.generate_content_async(prompt)
             script = response.text
             
             # Criar diretório para o projeto
@@ -140,9 +226,13 @@ class PipelineAutomatizado:
                 f.write(script)
             
             # Analisar o roteiro para extrair segmentos e prompts de imagem
-            segments = self.parse_script(script)
-            with open(project_dir / "segments.json", "w", encoding="utf-8") as f:
-                json.dump(segments, f, ensure_ascii=False, indent=2)
+            # (reaproveita segments.json se o roteiro não mudou desde a última análise)
+            segments = self._load_cached_segments(project_dir, script)
+            if segments is None:
+                segments = self.parse_script(script)
+                # Persistido já aqui para permitir retomar após falha nas etapas seguintes
+                self._persist_segments(project_dir, segments)
+                (project_dir / "script.hash").write_text(_script_hash(script), encoding="utf-8")
             
             logger.info(f"Roteiro gerado com {len(segments)} segmentos")
             return project_dir, segments
@@ -156,21 +246,20 @@ class PipelineAutomatizado:
         lines = script.split('\n')
         segments = []
         current_segment = None
-        
-        import re
-        timestamp_pattern = re.compile(r'\[(\d+):(\d+)\]')
-        image_pattern = re.compile(r'\(Imagem:?\s*(.*?)\)', re.IGNORECASE)
+        # Partes do texto do segmento atual, unidas uma vez ao fechá-lo
+        text_parts = []
         
         for line in lines:
             line = line.strip()
             if not line:
                 continue
             
-            # Procurar por timestamp
-            timestamp_match = timestamp_pattern.search(line)
+            # Procurar por timestamp (só roda o regex se a linha tiver '[')
+            timestamp_match = _TS_RE.search(line) if '[' in line else None
             if timestamp_match:
                 # Salvar segmento anterior
                 if current_segment:
+                    current_segment["text"] = " ".join(text_parts)
                     segments.append(current_segment)
                 
                 # Iniciar novo segmento
@@ -187,25 +276,47 @@ class PipelineAutomatizado:
                 }
                 
                 # Procurar por prompt de imagem
-                image_match = image_pattern.search(text)
+                image_match = _IMG_RE.search(text)
                 if image_match:
                     current_segment["image_prompt"] = image_match.group(1).strip()
-                    current_segment["text"] = text[:image_match.start()].strip()
+                    text = text[:image_match.start()].strip()
+                text_parts = [text]
             
             elif current_segment:
                 # Continuar segmento atual
-                image_match = image_pattern.search(line)
+                image_match = _IMG_RE.search(line)
                 if image_match:
                     current_segment["image_prompt"] = image_match.group(1).strip()
                 else:
-                    current_segment["text"] += " " + line
+                    text_parts.append(line)
         
         # Adicionar o último segmento
         if current_segment:
+            current_segment["text"] = " ".join(text_parts)
             segments.append(current_segment)
         
         return segments
     
+    def _load_cached_segments(self, project_dir, script):
+        """Retorna os segmentos salvos se script.hash bate com o roteiro atual"""
+        try:
+            cached_hash = (project_dir / "script.hash").read_text(encoding="utf-8")
+            if cached_hash != _script_hash(script):
+                return None
+            segments = _json_loads((project_dir / "segments.json").read_bytes())
+        except (FileNotFoundError, ValueError):
+            return None
+        
+        logger.info("Roteiro inalterado, reaproveitando segments.json")
+        return segments
+    
+    def _persist_segments(self, project_dir, segments):
+        """Grava segments.json de forma atômica (arquivo temporário + os.replace)"""
+        segments_file = project_dir / "segments.json"
+        tmp_file = segments_file.with_suffix(".json.tmp")
+        tmp_file.write_bytes(_json_dumps(segments))
+        os.replace(tmp_file, segments_file)
+    
     def generate_narration(self, project_dir, segments):
         """Gera narração para os segmentos do roteiro usando Google Cloud TTS"""
         logger.info("Gerando narração com Google Cloud TTS")
@@ -215,43 +326,20 @@ class PipelineAutomatizado:
             audio_dir = project_dir / "assets" / "audio"
             audio_dir.mkdir(exist_ok=True, parents=True)
             
-            # Preparar script para módulo TTS existente
-            script_for_tts = []
-            for i, segment in enumerate(segments):
-                script_for_tts.append({
-                    "id": f"segment_{i:02d}",
-                    "text": segment["text"]
-                })
-            
-            # Salvar script para TTS
-            with open(project_dir / "tts_script.json", "w", encoding="utf-8") as f:
-                json.dump(script_for_tts, f, ensure_ascii=False, indent=2)
-            
-            # Executar o módulo TTS existente no youtube_automation
-            cmd = [
-                "python", 
-                str(PROJECT_ROOT / "youtube_automation" / "tts_module.py"),
-                "--input", str(project_dir / "tts_script.json"),
-                "--output", str(audio_dir)
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode != 0:
-                logger.error(f"Erro no TTS: {result.stderr}")
-                return False
-            
-            logger.info(f"Narração gerada para {len(segments)} segmentos")
+            # Módulo TTS existente no youtube_automation, chamado no próprio processo
+            synthesize_text = _import_from(YOUTUBE_AUTOMATION_ROOT, "youtube_automation.tts_module").synthesize_text
             
-            # Atualizar segmentos com caminhos de áudio
             for i, segment in enumerate(segments):
-                segment["audio_file"] = str(audio_dir / f"segment_{i:02d}.wav")
-            
-            # Salvar segmentos atualizados
-            with open(project_dir / "segments.json", "w", encoding="utf-8") as f:
-                json.dump(segments, f, ensure_ascii=False, indent=2)
+                audio_file = str(audio_dir / f"segment_{i:02d}.wav")
+                synthesize_text(segment["text"], audio_file)
+                segment["audio_file"] = audio_file
             
+            logger.info(f"Narração gerada para {len(segments)} segmentos")
             return True
         
+        except ImportError:
+            # Ambiente mal configurado não é uma falha normal de geração
+            raise
         except Exception as e:
             logger.error(f"Erro ao gerar narração: {e}")
             return False
@@ -302,27 +390,15 @@ class PipelineAutomatizado:
                 with open(images_dir / f"prompt_{i:02d}.txt", "w", encoding="utf-8") as f:
                     f.write(enhanced_prompt)
             
-            # Salvar segmentos atualizados
-            with open(project_dir / "segments.json", "w", encoding="utf-8") as f:
-                json.dump(segments, f, ensure_ascii=False, indent=2)
-            
             logger.info(f"Prompts de imagem gerados para {len(segments)} segmentos")
             
             # NOTA: Aqui você poderia automatizar a chamada para o notebook do Colab
             # ou integrar diretamente com a API do Vertex AI
             
             # Se você precisar de um placeholder para desenvolvimento, gere imagens de cor única
-            for i, segment in enumerate(segments):
-                # Criar uma imagem de placeholder
-                try:
-                    from PIL import Image, ImageDraw, ImageFont
-                    img = Image.new('RGB', (1280, 720), color=(73, 109, 137))
-                    d = ImageDraw.Draw(img)
-                    d.text((640, 360), f"Imagem {i+1}: {segment.get('enhanced_image_prompt', '')[:50]}...", 
-                           fill=(255, 255, 255), anchor="mm")
-                    img.save(segment["image_file"])
-                except Exception as e:
-                    logger.warning(f"Não foi possível gerar imagem placeholder: {e}")
+            # (o encoder JPEG do PIL libera o GIL, então os saves rodam em paralelo)
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                list(executor.map(self._save_placeholder_image, range(len(segments)), segments))
             
             return True
             
@@ -330,6 +406,19 @@ class PipelineAutomatizado:
             logger.error(f"Erro ao gerar imagens: {e}")
             return False
     
+    def _save_placeholder_image(self, i, segment):
+        """Cria uma imagem de placeholder a partir do template em cache"""
+        try:
+            from PIL import ImageDraw
+            base, font = _placeholder_template()
+            img = base.copy()
+            d = ImageDraw.Draw(img)
+            d.text((640, 360), f"Imagem {i+1}: {segment.get('enhanced_image_prompt', '')[:50]}...", 
+                   fill=(255, 255, 255), anchor="mm", font=font)
+            img.save(segment["image_file"])
+        except Exception as e:
+            logger.warning(f"Não foi possível gerar imagem placeholder: {e}")
+    
     def assemble_video(self, project_dir, segments):
         """Monta o vídeo final a partir dos segmentos, narração e imagens"""
         logger.info("Montando vídeo final")
@@ -339,64 +428,82 @@ class PipelineAutomatizado:
             final_dir = project_dir / "final"
             final_dir.mkdir(exist_ok=True)
             
-            # Verificar se temos MoviePy instalado
-            try:
-                import moviepy.editor as mpy
-            except ImportError:
-                logger.error("MoviePy não está instalado. Execute: pip install moviepy")
+            # Verificar se temos o FFmpeg instalado
+            if shutil.which("ffmpeg") is None:
+                logger.error("FFmpeg não está instalado. Instale com: sudo apt install ffmpeg")
                 return False
             
-            # Criar clipes para cada segmento
-            clips = []
+            # Uma listagem por diretório de assets em vez de dois stats por segmento
+            existing_files = _list_existing_files(
+                path
+                for segment in segments
+                for path in (segment.get("audio_file"), segment.get("image_file"))
+                if path
+            )
+            
+            # Listas do concat demuxer (imagens e áudios) e legendas SRT
+            image_entries = []
+            audio_entries = []
+            captions = []
+            elapsed = 0.0
             for i, segment in enumerate(segments):
                 # Verificar se temos arquivo de áudio
-                if not os.path.exists(segment.get("audio_file", "")):
+                if segment.get("audio_file") not in existing_files:
                     logger.warning(f"Arquivo de áudio não encontrado para segmento {i}")
                     continue
                 
                 # Verificar se temos arquivo de imagem
-                if not os.path.exists(segment.get("image_file", "")):
+                if segment.get("image_file") not in existing_files:
                     logger.warning(f"Arquivo de imagem não encontrado para segmento {i}")
                     continue
                 
-                # Carregar áudio e obter duração
-                audio_clip = mpy.AudioFileClip(segment["audio_file"])
-                duration = audio_clip.duration
-                
-                # Criar clipe de imagem com duração igual ao áudio
-                img_clip = mpy.ImageClip(segment["image_file"]).set_duration(duration)
+                # Duração do segmento = duração do áudio (WAV do TTS)
+                with wave.open(segment["audio_file"], "rb") as wav:
+                    duration = wav.getnframes() / wav.getframerate()
                 
-                # Adicionar texto com o segmento do roteiro
-                txt_clip = mpy.TextClip(
-                    segment["text"][:50] + "..." if len(segment["text"]) > 50 else segment["text"],
-                    fontsize=24, color='white', bg_color='black', size=(img_clip.w, None), 
-                    method='caption'
-                ).set_position(('center', 'bottom')).set_duration(duration)
+                image_entries.append(f"file {_concat_path(segment['image_file'])}\nduration {duration:.3f}\n")
+                audio_entries.append(f"file {_concat_path(segment['audio_file'])}\n")
                 
-                # Combinar imagem e texto
-                video_clip = mpy.CompositeVideoClip([img_clip, txt_clip])
-                
-                # Adicionar áudio
-                final_clip = video_clip.set_audio(audio_clip)
-                
-                clips.append(final_clip)
-            
-            if not clips:
+                text = segment["text"][:50] + "..." if len(segment["text"]) > 50 else segment["text"]
+                captions.append(
+                    f"{len(captions) + 1}\n"
+                    f"{_srt_time(elapsed)} --> {_srt_time(elapsed + duration)}\n"
+                    f"{text}\n"
+                )
+                elapsed += duration
+            
+            if not image_entries:
                 logger.error("Nenhum clipe válido para montar o vídeo")
                 return False
             
-            # Concatenar todos os clipes
-            final_video = mpy.concatenate_videoclips(clips, method="compose")
+            # O concat demuxer ignora a duração da última entrada sem repetir o arquivo
+            image_entries.append(image_entries[-1].split("\n", 1)[0] + "\n")
+            
+            (final_dir / "images.txt").write_text("".join(image_entries), encoding="utf-8")
+            (final_dir / "audio.txt").write_text("".join(audio_entries), encoding="utf-8")
+            (final_dir / "captions.srt").write_text("\n".join(captions), encoding="utf-8")
             
-            # Salvar vídeo final
+            # Uma única chamada ao FFmpeg: decodifica, legenda e codifica em código nativo
             output_file = final_dir / "video_final.mp4"
-            final_video.write_videofile(
-                str(output_file),
-                fps=24,
-                codec='libx264',
-                audio_codec='aac',
-                threads=4
-            )
+            cmd = [
+                "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+                "-f", "concat", "-safe", "0", "-i", "images.txt",
+                "-f", "concat", "-safe", "0", "-i", "audio.txt",
+                "-vf", (
+                    "scale=1280:720:force_original_aspect_ratio=decrease,"
+                    "pad=1280:720:(ow-iw)/2:(oh-ih)/2,fps=24,format=yuv420p,"
+                    "subtitles=captions.srt:force_style='Fontsize=24'"
+                ),
+                "-c:v", "libx264", "-preset", "veryfast",
+                "-c:a", "aac", "-shortest",
+                output_file.name
+            ]
+            
+            # cwd=final_dir mantém os caminhos do filtro relativos (sem escapes)
+            result = subprocess.run(cmd, cwd=final_dir, capture_output=True, text=True)
+            if result.returncode != 0:
+                logger.error(f"Erro no FFmpeg: {result.stderr.strip()}")
+                return False
             
             logger.info(f"Vídeo final montado e salvo em: {output_file}")
             return True
@@ -410,31 +517,28 @@ class PipelineAutomatizado:
         logger.info("Iniciando upload para o Google Drive")
         
         try:
-            # Executar o módulo de upload existente
-            cmd = [
-                "python",
-                str(PROJECT_ROOT / "drive-uploader" / "backend" / "upload.py"),
-                "--input-dir", str(project_dir)
-            ]
+            # Um único DriveUploader autenticado por execução, sem subprocesso
+            if self._drive is None:
+                DriveUploader = _import_from(NOVO_DIR, "drive_uploader").DriveUploader
+                self._drive = DriveUploader()
             
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode != 0:
-                logger.error(f"Erro no upload para Drive: {result.stderr}")
-                return False
+            result = self._drive.upload_directory(project_dir, project_dir.name)
             
-            logger.info("Upload para Google Drive concluído com sucesso")
+            logger.info(f"Upload para Google Drive concluído com sucesso: {result['main_folder_url']}")
             return True
             
+        except ImportError:
+            raise
         except Exception as e:
             logger.error(f"Erro ao fazer upload para Google Drive: {e}")
             return False
     
-    def run_pipeline(self):
+    async def run_pipeline(self):
         """Executa o pipeline completo de automação"""
         logger.info("Iniciando pipeline de automação de vídeo")
         
         # Passo 1: Descobrir tópicos em alta
-        topics = self.discover_trending_topics()
+        topics = await self.discover_trending_topics()
         if not topics:
             logger.error("Não foi possível descobrir tópicos em alta")
             return False
@@ -444,18 +548,21 @@ class PipelineAutomatizado:
         logger.info(f"Tópico selecionado: {selected_topic['title']}")
         
         # Passo 2: Gerar roteiro
-        project_dir, segments = self.generate_script(selected_topic)
+        project_dir, segments = await self.generate_script(selected_topic)
         if not project_dir or not segments:
             logger.error("Não foi possível gerar o roteiro")
             return False
         
-        # Passo 3: Gerar narração
-        if not self.generate_narration(project_dir, segments):
+        # Passos 3 e 4: narração e imagens são independentes, então rodam em paralelo
+        narration_ok, images_ok = await asyncio.gather(
+            asyncio.to_thread(self.generate_narration, project_dir, segments),
+            asyncio.to_thread(self.generate_images, project_dir, segments)
+        )
+        if not narration_ok:
             logger.error("Não foi possível gerar a narração")
             return False
         
-        # Passo 4: Gerar imagens
-        if not self.generate_images(project_dir, segments):
+        if not images_ok:
             logger.error("Não foi possível gerar as imagens")
             return False
         
@@ -464,6 +571,9 @@ class PipelineAutomatizado:
             logger.error("Não foi possível montar o vídeo")
             return False
         
+        # Salvar segmentos com os caminhos de áudio e imagem (uma única escrita)
+        self._persist_segments(project_dir, segments)
+        
         # Passo 6: Fazer upload para o Google Drive
         if not self.upload_to_drive(project_dir):
             logger.error("Não foi possível fazer upload para o Google Drive")
@@ -473,10 +583,30 @@ class PipelineAutomatizado:
         return True
 
 
+# Loop de eventos persistente do processo. O genai cacheia o cliente assíncrono
+# (grpc.aio) no módulo e ele fica preso ao primeiro loop em que foi usado, então
+# um asyncio.run por execução agendada quebraria a partir da segunda execução.
+_event_loop = None
+
+
+def _run_async(coro):
+    """Executa a corrotina sempre no mesmo loop de eventos do processo"""
+    global _event_loop
+    if _event_loop is None or _event_loop.is_closed():
+        _event_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_event_loop)
+    return _event_loop.run_until_complete(coro)
+
+
 def run_scheduled_job():
     """Executa o job agendado"""
-    pipeline = PipelineAutomatizado()
-    pipeline.run_pipeline()
+    try:
+        pipeline = PipelineAutomatizado()
+        _run_async(pipeline.run_pipeline())
+    except Exception:
+        # schedule.run_pending não captura exceções: uma execução com ambiente
+        # quebrado (ex.: ImportError) não pode derrubar o loop do --schedule
+        logger.exception("Execução agendada falhou; nova tentativa no próximo horário")
 
 
 if __name__ == "__main__":
@@ -492,4 +622,4 @@ if __name__ == "__main__":
     else:
         # Execução direta
         pipeline = PipelineAutomatizado()
-        pipeline.run_pipeline()
\ No newline at end of file
+        _run_async(pipeline.run_pipeline())
\ No newline at end of file
@@ -2,28 +2,62 @@
 import os
 import sys
 import time
+import asyncio
+import contextlib
 import json
+import queue
+import random
+import atexit
 import logging
 import datetime
-import schedule
-from dotenv import load_dotenv
-import googleapiclient.discovery
-from google.oauth2 import service_account
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
-# Configuração de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("pipeline.log"),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+from _env import ensure_env_loaded
+
+# Configuração de logging: arquivo e console são escritos por uma thread
+# dedicada (QueueListener), sem I/O de disco nas chamadas logger.*
+class _CachedTimeFormatter(logging.Formatter):
+    """Formatter que só refaz o strftime quando o segundo muda"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._last_sec = None
+        self._last_str = ""
+    
+    def formatTime(self, record, datefmt=None):
+        if datefmt:
+            return super().formatTime(record, datefmt)
+        
+        sec = int(record.created)
+        if sec != self._last_sec:
+            self._last_sec = sec
+            self._last_str = time.strftime(self.default_time_format, self.converter(sec))
+        return self.default_msec_format % (self._last_str, record.msecs)
+
+
+_log_formatter = _CachedTimeFormatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_log_handlers = [
+    logging.FileHandler("pipeline.log", delay=True),  # abre o arquivo só no primeiro log
+    logging.StreamHandler(sys.stdout)
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+
+log_queue = queue.Queue(-1)
+log_listener = QueueListener(log_queue, *_log_handlers)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+# Mesmo comportamento do basicConfig: não sobrescreve logging já configurado
+_root_logger = logging.getLogger()
+if not _root_logger.handlers:
+    _root_logger.setLevel(logging.INFO)
+    _root_logger.addHandler(QueueHandler(log_queue))
 logger = logging.getLogger("pipeline")
 
-# Carrega variáveis de ambiente
-load_dotenv()
+# Carrega variáveis de ambiente (as constantes abaixo dependem delas)
+ensure_env_loaded()
 
 # Configuração de caminhos
 YOUTUBE_AUTOMATION_DIR = Path("youtube_automation")
@@ -32,12 +66,79 @@ LOGS_DIR = Path("logs")
 CREDENTIALS_PATH = os.getenv("DRIVE_CREDENTIALS_PATH", "google-drive-credentials.json")
 SHEETS_TRACKING_ID = os.getenv("SHEETS_TRACKING_ID", "")  # ID da planilha para tracking
 
+# Status que indicam projeto ainda não produzido
+PENDING_STATUSES = frozenset({"", "Pendente", "Aguardando"})
+
+# Validade (s) do cache de leituras da planilha, compartilhado entre instâncias
+SHEET_CACHE_TTL = 60
+
+# Teto (s) de cada sleep do modo agendado; reavalia o próximo job depois disso
+SCHEDULER_MAX_SLEEP = 3600
+
+# Timeout (s) das conexões HTTP com a Sheets API
+HTTP_TIMEOUT = 30
+
+# Tentativas por requisição ao Sheets e status HTTP considerados transitórios
+SHEETS_API_RETRIES = 5
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503})
+
+# Leitura da saída dos scripts: tamanho de cada bloco e maior linha mantida em memória
+SUBPROCESS_READ_SIZE = 64 * 1024
+SUBPROCESS_MAX_LINE = 1024 * 1024
+
+# Renova o token do Sheets antes de expirar (evita refresh durante uma escrita)
+TOKEN_REFRESH_MARGIN = datetime.timedelta(minutes=5)
+
+def _registrar_linha(raw, level, origem):
+    line = raw.decode(errors='replace').strip()
+    if line:
+        logger.log(level, f"[{origem}] {line}")
+
+async def _encaminhar_saida(stream, level, origem):
+    """Registra no log cada linha de um pipe de subprocesso assim que chega
+    
+    Lê em blocos e separa as linhas aqui (\n ou \r, como nas barras de
+    progresso): sem o limite de 64 KiB do StreamReader.readline, e uma
+    linha sem quebra nunca acumula mais que SUBPROCESS_MAX_LINE bytes.
+    """
+    pending = b''
+    while True:
+        chunk = await stream.read(SUBPROCESS_READ_SIZE)
+        if not chunk:
+            break
+        lines = (pending + chunk).splitlines(keepends=True)
+        pending = b''
+        if not lines[-1].endswith((b'\n', b'\r')):
+            pending = lines.pop()
+            if len(pending) >= SUBPROCESS_MAX_LINE:
+                lines.append(pending)
+                pending = b''
+        for raw in lines:
+            _registrar_linha(raw, level, origem)
+    _registrar_linha(pending, level, origem)
+
 class PipelineIntegrado:
+    # Etapas do pipeline (nome, método), agrupadas: grupos rodam em sequência,
+    # etapas do mesmo grupo em paralelo (narração e imagens dependem só do roteiro)
+    ETAPAS = (
+        (("Descoberta de conteúdo", "descobrir_conteudo"),),
+        (("Geração de roteiro", "gerar_roteiro"),),
+        (("Geração de narração", "gerar_narracao"),
+         ("Processamento de imagens", "processar_imagens")),
+        (("Montagem de vídeo", "montar_video"),),
+        (("Upload para Google Drive", "upload_drive"),),
+    )
+    
+    # (spreadsheetId, ranges) -> (timestamp monotônico, resposta)
+    _sheet_cache = {}
+    
     def __init__(self):
         self.today_date = datetime.datetime.now().strftime("%Y-%m-%d")
         self.project_name = None
         self.output_dir = None
         self.status_sheet = None
+        self._creds = None
+        self._pending_sheet_writes = {}  # range -> valor, gravados em lote
         self.row_index = None  # Inicializar row_index
         
         # Verifica se os diretórios necessários existem
@@ -60,60 +161,152 @@ class PipelineIntegrado:
     def _initialize_sheets(self):
         """Inicializa conexão com Google Sheets para tracking"""
         try:
+            # Imports pesados só quando o tracking está configurado
+            import httplib2
+            import googleapiclient.discovery
+            from google.oauth2 import service_account
+            from google_auth_httplib2 import AuthorizedHttp
+            
             credentials = service_account.Credentials.from_service_account_file(
                 CREDENTIALS_PATH,
                 scopes=['https://www.googleapis.com/auth/spreadsheets']
             )
-            service = googleapiclient.discovery.build('sheets', 'v4', credentials=credentials)
+            # Um Http persistente mantém a conexão TLS aberta entre as chamadas
+            authed_http = AuthorizedHttp(credentials, http=httplib2.Http(timeout=HTTP_TIMEOUT))
+            
+            # Documento de descoberta embutido na lib: sem round-trip extra no build
+            service = googleapiclient.discovery.build(
+                'sheets', 'v4', http=authed_http,
+                cache_discovery=False, static_discovery=True
+            )
+            self._creds = credentials
             self.status_sheet = service.spreadsheets()
+            self._refresh_credentials()
             logger.info("Conexão com Google Sheets inicializada com sucesso")
         except Exception as e:
             logger.error(f"Erro ao inicializar Google Sheets: {e}")
             self.status_sheet = None
     
-    def _update_sheet_status(self, row_index, status, url=None):
-        """Atualiza o status na planilha de tracking"""
+    def _refresh_credentials(self):
+        """Renova o token apenas se inválido ou perto de expirar"""
+        creds = self._creds
+        if creds is None:
+            return
+        
+        expiry = creds.expiry
+        near_expiry = expiry is not None and expiry - datetime.datetime.utcnow() < TOKEN_REFRESH_MARGIN
+        if creds.valid and not near_expiry:
+            return
+        
+        from google.auth.transport.requests import Request
+        creds.refresh(Request())
+    
+    def _update_sheet_status(self, row_index, status, url=None, flush=False):
+        """Registra o status para a planilha de tracking (gravado em lote no flush)"""
         if not self.status_sheet or not SHEETS_TRACKING_ID or not row_index:
             logger.info(f"Status local: {status}" + (f" - URL: {url}" if url else ""))
             return
         
+        # Escritas na mesma célula se sobrescrevem: só o último status vai para a planilha
+        self._pending_sheet_writes[f'Produção!D{row_index}'] = status
+        if url:
+            self._pending_sheet_writes[f'Produção!E{row_index}'] = url
+        logger.info(f"Status registrado: {status}")
+        
+        if flush:
+            self._flush_sheet_writes()
+    
+    @staticmethod
+    def _api_execute(request, retries=SHEETS_API_RETRIES):
+        """Executa uma requisição da API com backoff exponencial em erros transitórios"""
+        from googleapiclient.errors import HttpError
+        
+        for attempt in range(retries):
+            try:
+                return request.execute()
+            except HttpError as e:
+                if e.resp.status not in RETRYABLE_STATUS or attempt == retries - 1:
+                    raise
+                delay = 2 ** attempt + random.random()
+                logger.warning(f"Sheets API retornou {e.resp.status}, nova tentativa em {delay:.1f}s")
+                time.sleep(delay)
+    
+    def _flush_sheet_writes(self):
+        """Grava todas as atualizações pendentes em um único batchUpdate"""
+        if not self._pending_sheet_writes:
+            return
+        
+        data = [
+            {'range': range_name, 'values': [[value]]}
+            for range_name, value in self._pending_sheet_writes.items()
+        ]
         try:
-            # Atualiza o status
-            range_name = f'Produção!D{row_index}'
-            body = {
-                'values': [[status]]
-            }
-            self.status_sheet.values().update(
+            self._refresh_credentials()
+            self._api_execute(self.status_sheet.values().batchUpdate(
                 spreadsheetId=SHEETS_TRACKING_ID,
-                range=range_name,
-                valueInputOption='USER_ENTERED',
-                body=body
-            ).execute()
+                body={'valueInputOption': 'USER_ENTERED', 'data': data}
+            ))
             
-            # Se houver URL, atualiza também
-            if url:
-                range_name = f'Produção!E{row_index}'
-                body = {
-                    'values': [[url]]
-                }
-                self.status_sheet.values().update(
-                    spreadsheetId=SHEETS_TRACKING_ID,
-                    range=range_name,
-                    valueInputOption='USER_ENTERED',
-                    body=body
-                ).execute()
-                
-            logger.info(f"Status atualizado na planilha: {status}")
+            self._pending_sheet_writes.clear()
+            self._invalidate_sheet_cache()
+            logger.info(f"Planilha atualizada ({len(data)} células)")
         except Exception as e:
             logger.error(f"Erro ao atualizar planilha: {e}")
     
-    def descobrir_conteudo(self):
+    @classmethod
+    def _invalidate_sheet_cache(cls):
+        """Descarta leituras em cache da planilha de tracking após uma escrita"""
+        for key in [k for k in cls._sheet_cache if k[0] == SHEETS_TRACKING_ID]:
+            cls._sheet_cache.pop(key, None)
+    
+    async def _executar_script(self, script, *args, cwd=YOUTUBE_AUTOMATION_DIR):
+        """Executa um script Python como subprocesso assíncrono (sem shell)"""
+        # Diretório e projeto vão pelo ambiente; os scripts aceitam também os argumentos de CLI
+        env = {
+            **os.environ,
+            'PIPELINE_OUTPUT_DIR': str(self.output_dir.absolute()),
+            'PIPELINE_PROJECT_NAME': self.project_name,
+        }
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, script, *args,
+            cwd=str(cwd),
+            env=env,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        # Saída do script vai para o log linha a linha, sem acumular em memória
+        try:
+            await asyncio.gather(
+                _encaminhar_saida(proc.stdout, logging.INFO, script),
+                _encaminhar_saida(proc.stderr, logging.WARNING, script),
+            )
+        except BaseException:
+            # Ninguém mais drena os pipes: encerra o filho antes que ele trave
+            if proc.returncode is None:
+                with contextlib.suppress(ProcessLookupError):
+                    proc.kill()
+            await proc.wait()
+            raise
+        await proc.wait()
+        
+        if proc.returncode != 0:
+            logger.error(f"{script} falhou com código: {proc.returncode}")
+        return proc.returncode
+    
+    async def _atualizar_status(self, status, url=None, flush=False):
+        """Registra o status; com flush a gravação roda em uma thread para não bloquear o event loop"""
+        if flush:
+            await asyncio.to_thread(self._update_sheet_status, self.row_index, status, url, True)
+        else:
+            self._update_sheet_status(self.row_index, status, url)
+    
+    async def descobrir_conteudo(self):
         """Executa a descoberta de conteúdo"""
         logger.info("Iniciando descoberta de conteúdo em alta...")
         
         try:
             # Obtém o próximo projeto da planilha de tracking ou gera um novo
-            self.project_name = self._obter_proximo_projeto()
+            self.project_name = await asyncio.to_thread(self._obter_proximo_projeto)
             if not self.project_name:
                 self.project_name = f"Conteudo_Auto_{self.today_date}"
             
@@ -127,15 +320,14 @@ class PipelineIntegrado:
             (self.output_dir / "temp").mkdir(exist_ok=True)
             
             # Executa o script de descoberta de conteúdo
-            cmd = f"cd {YOUTUBE_AUTOMATION_DIR} && python content_discovery.py --output-dir {self.output_dir.absolute()}"
-            result = os.system(cmd)
+            result = await self._executar_script("content_discovery.py")
             
             if result != 0:
                 logger.error(f"Comando de descoberta falhou com código: {result}")
                 return False
             
             # Atualiza status
-            self._update_sheet_status(self.row_index, "Conteúdo Descoberto")
+            await self._atualizar_status("Conteúdo Descoberto")
             return True
         except Exception as e:
             logger.error(f"Erro na descoberta de conteúdo: {e}")
@@ -148,20 +340,37 @@ class PipelineIntegrado:
             return None
         
         try:
-            # Busca projetos pendentes na planilha
-            result = self.status_sheet.values().get(
-                spreadsheetId=SHEETS_TRACKING_ID,
-                range='Produção!A2:D50'  # Ajuste o intervalo conforme sua planilha
-            ).execute()
+            self._refresh_credentials()
+            
+            # Busca só as colunas de nome (A) e status (D), uma lista por coluna
+            ranges = ('Produção!A2:A', 'Produção!D2:D')
+            cache_key = (SHEETS_TRACKING_ID, ranges)
+            cached = self._sheet_cache.get(cache_key)
+            if cached and time.monotonic() - cached[0] < SHEET_CACHE_TTL:
+                result = cached[1]
+            else:
+                result = self._api_execute(self.status_sheet.values().batchGet(
+                    spreadsheetId=SHEETS_TRACKING_ID,
+                    ranges=list(ranges),
+                    majorDimension='COLUMNS'
+                ))
+                self._sheet_cache[cache_key] = (time.monotonic(), result)
+            
+            names_range, status_range = result.get('valueRanges', [{}, {}])
+            names = (names_range.get('values') or [[]])[0]
+            statuses = (status_range.get('values') or [[]])[0]
+            # A API omite células vazias no final da coluna
+            statuses += [""] * (len(names) - len(statuses))
             
-            rows = result.get('values', [])
-            for i, row in enumerate(rows, start=2):  # Começamos do índice 2 pois A1 é cabeçalho
-                # Verifica se há um projeto pendente (status vazio ou "Pendente")
-                if len(row) >= 1:  # Pelo menos deve ter nome do projeto
-                    status = row[3] if len(row) > 3 else ""
-                    if status in ["", "Pendente", "Aguardando"]:
-                        self.row_index = i
-                        return row[0] if len(row) > 0 else None
+            # Primeiro projeto com nome e status vazio, "Pendente" ou "Aguardando"
+            idx = next(
+                (i for i, (name, status) in enumerate(zip(names, statuses))
+                 if name and status in PENDING_STATUSES),
+                None
+            )
+            if idx is not None:
+                self.row_index = idx + 2  # A1 é cabeçalho
+                return names[idx]
             
             logger.info("Nenhum projeto pendente encontrado na planilha")
             return None
@@ -169,147 +378,166 @@ class PipelineIntegrado:
             logger.error(f"Erro ao buscar próximo projeto: {e}")
             return None
     
-    def gerar_roteiro(self):
+    async def gerar_roteiro(self):
         """Gera roteiro para o conteúdo"""
         logger.info(f"Gerando roteiro para: {self.project_name}")
         
         try:
             # Executa o script de geração de roteiro
-            os.system(f"cd {YOUTUBE_AUTOMATION_DIR} && python script_generator.py --output-dir {self.output_dir}")
-            
+            result = await self._executar_script("script_generator.py")
+            if result != 0:
+                return False
+
             # Atualiza status
-            self._update_sheet_status(self.row_index, "Roteiro Gerado")
+            await self._atualizar_status("Roteiro Gerado")
             return True
         except Exception as e:
             logger.error(f"Erro na geração de roteiro: {e}")
             return False
     
-    def gerar_narracao(self):
+    async def gerar_narracao(self):
         """Gera narração para o roteiro"""
         logger.info(f"Gerando narração para: {self.project_name}")
         
         try:
             # Executa o script de geração de narração
-            os.system(f"cd {YOUTUBE_AUTOMATION_DIR} && python narration_generator.py --output-dir {self.output_dir}")
-            
+            result = await self._executar_script("narration_generator.py")
+            if result != 0:
+                return False
+
             # Atualiza status
-            self._update_sheet_status(self.row_index, "Narração Gerada")
+            await self._atualizar_status("Narração Gerada")
             return True
         except Exception as e:
             logger.error(f"Erro na geração de narração: {e}")
             return False
     
-    def processar_imagens(self):
+    async def processar_imagens(self):
         """Processa imagens para o vídeo"""
         logger.info(f"Processando imagens para: {self.project_name}")
         
         try:
             # Executa o script de processamento de imagens
-            os.system(f"cd {YOUTUBE_AUTOMATION_DIR} && python image_processor.py --output-dir {self.output_dir}")
-            
+            result = await self._executar_script("image_processor.py")
+            if result != 0:
+                return False
+
             # Atualiza status
-            self._update_sheet_status(self.row_index, "Imagens Processadas")
+            await self._atualizar_status("Imagens Processadas")
             return True
         except Exception as e:
             logger.error(f"Erro no processamento de imagens: {e}")
             return False
     
-    def montar_video(self):
+    async def montar_video(self):
         """Monta o vídeo final"""
         logger.info(f"Montando vídeo final: {self.project_name}")
 
         try:
             # Executa o script de montagem de vídeo
-            os.system(f"cd {YOUTUBE_AUTOMATION_DIR} && python video_assembler.py --output-dir {self.output_dir}")
+            result = await self._executar_script("video_assembler.py")
+            if result != 0:
+                return False
 
             # Atualiza status
-            self._update_sheet_status(self.row_index, "Vídeo Montado")
+            await self._atualizar_status("Vídeo Montado")
             return True
         except Exception as e:
             logger.error(f"Erro na montagem do vídeo: {e}")
             return False
 
-    def upload_drive(self):
+    def _ler_drive_url(self):
+        """Lê a URL da pasta do Drive gravada pelo uploader (se disponível)"""
+        try:
+            return (self.output_dir / "drive_url.txt").read_text().strip() or None
+        except FileNotFoundError:
+            return None
+    
+    async def upload_drive(self):
         """Upload de arquivos para o Google Drive"""
         logger.info(f"Realizando upload para o Drive: {self.project_name}")
 
         try:
             # Executa o script de upload do Drive usando o drive_uploader.py local
-            result = os.system(f"python drive_uploader.py --input-dir {self.output_dir} --project-name '{self.project_name}'")
+            result = await self._executar_script("drive_uploader.py", cwd=Path(__file__).parent)
+            if result != 0:
+                return False
 
-            # Obtém URL do Google Drive da saída do upload (se disponível)
-            drive_url = None
-            url_file = self.output_dir / "drive_url.txt"
-            if url_file.exists():
-                with open(url_file, 'r') as f:
-                    drive_url = f.read().strip()
+            # O uploader grava a URL antes de sair; um drive_url.txt de uma
+            # execução anterior não vale para um upload que falhou
+            drive_url = await asyncio.to_thread(self._ler_drive_url)
 
             # Atualiza status
-            self._update_sheet_status(self.row_index, "Upload Concluído", drive_url)
-            return result == 0
+            await self._atualizar_status("Upload Concluído", drive_url, flush=True)
+            return True
         except Exception as e:
             logger.error(f"Erro no upload para o Drive: {e}")
             return False
     
-    def executar_pipeline_completo(self):
+    async def executar_pipeline_completo(self):
         """Executa o pipeline completo de automação"""
         logger.info("Iniciando execução do pipeline completo...")
         
-        # Executa cada etapa do pipeline
-        if self.descobrir_conteudo():
-            logger.info("✓ Etapa 1: Descoberta de conteúdo concluída")
-            
-            if self.gerar_roteiro():
-                logger.info("✓ Etapa 2: Geração de roteiro concluída")
-                
-                if self.gerar_narracao():
-                    logger.info("✓ Etapa 3: Geração de narração concluída")
-                    
-                    if self.processar_imagens():
-                        logger.info("✓ Etapa 4: Processamento de imagens concluído")
-                        
-                        if self.montar_video():
-                            logger.info("✓ Etapa 5: Montagem de vídeo concluída")
-
-                            if self.upload_drive():
-                                logger.info("✓ Etapa 6: Upload para Google Drive concluído")
-                                logger.info("Pipeline concluído com sucesso!")
-                                return True
-                            else:
-                                logger.error("✗ Etapa 6: Falha no upload para Google Drive")
-                        else:
-                            logger.error("✗ Etapa 5: Falha na montagem do vídeo")
-                    else:
-                        logger.error("✗ Etapa 4: Falha no processamento de imagens")
-                else:
-                    logger.error("✗ Etapa 3: Falha na geração de narração")
-            else:
-                logger.error("✗ Etapa 2: Falha na geração de roteiro")
+        try:
+            return await self._executar_etapas()
+        finally:
+            # Uma única escrita na planilha por execução (sucesso ou falha)
+            await asyncio.to_thread(self._flush_sheet_writes)
+    
+    async def _executar_etapa(self, numero, nome, metodo):
+        """Executa uma etapa registrando resultado e duração"""
+        inicio = time.perf_counter()
+        ok = await getattr(self, metodo)()
+        duracao = time.perf_counter() - inicio
+        
+        if ok:
+            logger.info(f"✓ Etapa {numero}: {nome} ({duracao:.1f}s)")
         else:
-            logger.error("✗ Etapa 1: Falha na descoberta de conteúdo")
+            logger.error(f"✗ Etapa {numero}: Falha em {nome} ({duracao:.1f}s)")
+        return ok
+    
+    async def _executar_etapas(self):
+        """Executa os grupos de etapas em sequência, parando na primeira falha"""
+        numero = 1
+        for grupo in self.ETAPAS:
+            # Etapas do mesmo grupo não dependem uma da outra: rodam em paralelo
+            resultados = await asyncio.gather(*(
+                self._executar_etapa(numero + i, nome, metodo)
+                for i, (nome, metodo) in enumerate(grupo)
+            ))
+            numero += len(grupo)
+            
+            if not all(resultados):
+                logger.error("Pipeline falhou!")
+                return False
         
-        logger.error("Pipeline falhou!")
-        return False
-
+        logger.info("Pipeline concluído com sucesso!")
+        return True
 
 def executar_job():
     """Função para executar o pipeline como um job agendado"""
     pipeline = PipelineIntegrado()
-    pipeline.executar_pipeline_completo()
+    asyncio.run(pipeline.executar_pipeline_completo())
 
 
 if __name__ == "__main__":
     # Verificar se há argumentos para execução programada
     if len(sys.argv) > 1 and sys.argv[1] == "--schedule":
+        import schedule
+        
         logger.info("Modo agendado iniciado. Programando execução para 3h da manhã.")
         # Agenda para executar às 3 da manhã
         schedule.every().day.at("03:00").do(executar_job)
         
-        # Loop para verificar continuamente o agendamento
+        # Dorme até o próximo job (no máximo SCHEDULER_MAX_SLEEP por vez)
         while True:
+            idle = schedule.idle_seconds()
+            if idle is None:
+                break  # Nenhum job agendado
+            if idle > 0:
+                time.sleep(min(idle, SCHEDULER_MAX_SLEEP))
             schedule.run_pending()
-            time.sleep(60)  # Verifica a cada minuto
     else:
         # Execução direta do pipeline
         pipeline = PipelineIntegrado()
-        pipeline.executar_pipeline_completo()
\ No newline at end of file
+        asyncio.run(pipeline.executar_pipeline_completo())
\ No newline at end of file
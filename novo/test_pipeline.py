@@ -7,11 +7,19 @@ Inclui testes unitários, integração e validação de funcionalidades
 
 import unittest
 import tempfile
+import asyncio
+import hashlib
+import importlib.util
+import io
 import json
 import os
+import re
 import sys
+import threading
 from pathlib import Path
-from unittest.mock import patch, MagicMock, mock_open
+from types import SimpleNamespace
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch, MagicMock, AsyncMock, mock_open
 import logging
 
 # Configurar logging para testes
@@ -21,6 +29,21 @@ logging.basicConfig(level=logging.WARNING)
 sys.path.append('youtube_automation')
 sys.path.append('.')
 
+# Esperas de rate limit/backoff (time.sleep, asyncio.sleep) retornam na hora durante os testes
+_asyncio_sleep = asyncio.sleep
+_sleep_patches = [
+    patch('time.sleep', lambda *args: None),
+    patch('asyncio.sleep', lambda delay, result=None: _asyncio_sleep(0, result)),
+]
+
+def setUpModule():
+    for sleep_patch in _sleep_patches:
+        sleep_patch.start()
+
+def tearDownModule():
+    for sleep_patch in _sleep_patches:
+        sleep_patch.stop()
+
 class TestDriveUploader(unittest.TestCase):
     """Testes para o sistema de upload do Google Drive"""
     
@@ -98,6 +121,191 @@ class TestDriveUploader(unittest.TestCase):
                 result = uploader._determine_target_folder(file_path, folder_mapping)
                 self.assertEqual(result, expected_folder)
 
+@unittest.skipUnless(importlib.util.find_spec('googleapiclient'), "googleapiclient não instalado")
+class TestDriveUploadCache(unittest.TestCase):
+    """Testes do manifesto de uploads (dedup por hash de conteúdo)"""
+    
+    def setUp(self):
+        from drive_uploader import DriveUploader, _RateLimiter
+        
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.file_path = self.temp_dir / 'audio.mp3'
+        self.file_path.write_bytes(b'conteudo de teste')
+        self.digest = hashlib.sha256(b'conteudo de teste').hexdigest()
+        
+        # Instância sem autenticação, com service mockado
+        self.service = MagicMock()
+        self.uploader = DriveUploader.__new__(DriveUploader)
+        self.uploader._local = threading.local()
+        self.uploader._local.service = self.service
+        self.uploader._cache_lock = threading.Lock()
+        self.uploader._rate_limiter = _RateLimiter(0)
+        self.uploader.upload_file = MagicMock(return_value={'id': 'novo-id', 'name': 'audio.mp3'})
+    
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _upload(self, cache):
+        with os.scandir(self.temp_dir) as entries:
+            entry = next(e for e in entries if e.name == 'audio.mp3')
+            return self.uploader._upload_file_cached(entry, 'audio.mp3', 'pasta-id', 'desc', cache)
+    
+    def _drive_file(self, file_id, parents, name='audio.mp3', trashed=False):
+        """Metadados devolvidos por files.get para um arquivo já enviado"""
+        return {'id': file_id, 'name': name, 'parents': parents, 'trashed': trashed}
+    
+    def test_manifest_hit_already_in_place_skips_write(self):
+        """Conteúdo já na pasta de destino: nenhuma cópia nem upload"""
+        self.service.files().get().execute.return_value = self._drive_file('antigo-id', ['pasta-id'])
+        cache = {'hashes': {self.digest: 'antigo-id'}, 'stats': {}}
+        
+        file_info = self._upload(cache)
+        
+        self.service.files().get.assert_called_with(
+            fileId='antigo-id',
+            fields='id,name,webViewLink,size,parents,trashed'
+        )
+        self.service.files().copy.assert_not_called()
+        self.uploader.upload_file.assert_not_called()
+        self.assertEqual(file_info['id'], 'antigo-id')
+        self.assertEqual(cache['stats']['audio.mp3']['file_id'], 'antigo-id')
+    
+    def test_manifest_hit_in_other_folder_copies_on_server(self):
+        """Conteúdo enviado para outra pasta: files.copy no servidor, sem novo upload"""
+        self.service.files().get().execute.return_value = self._drive_file('antigo-id', ['outra-pasta'])
+        self.service.files().copy().execute.return_value = {'id': 'copia-id', 'name': 'audio.mp3'}
+        cache = {'hashes': {self.digest: 'antigo-id'}, 'stats': {}}
+        
+        file_info = self._upload(cache)
+        
+        self.service.files().copy.assert_called_with(
+            fileId='antigo-id',
+            body={'name': 'audio.mp3', 'description': 'desc', 'parents': ['pasta-id']},
+            fields='id,name,webViewLink,size'
+        )
+        self.uploader.upload_file.assert_not_called()
+        self.assertEqual(file_info['id'], 'copia-id')
+        self.assertEqual(cache['hashes'][self.digest], 'copia-id')
+    
+    def test_manifest_miss_uploads(self):
+        """Conteúdo novo: upload normal e manifesto atualizado"""
+        cache = {'hashes': {}, 'stats': {}}
+        
+        file_info = self._upload(cache)
+        
+        self.uploader.upload_file.assert_called_once_with(
+            os.path.join(self.temp_dir, 'audio.mp3'), 'pasta-id', 'desc'
+        )
+        self.service.files().copy().execute.assert_not_called()
+        self.assertEqual(file_info['id'], 'novo-id')
+        self.assertEqual(cache['hashes'][self.digest], 'novo-id')
+        self.assertEqual(cache['stats']['audio.mp3']['sha256'], self.digest)
+        self.assertEqual(cache['stats']['audio.mp3']['file_id'], 'novo-id')
+    
+    def test_changed_file_updates_previous_upload(self):
+        """Arquivo alterado: files.update no id anterior, sem criar um segundo arquivo"""
+        self.service.files().get().execute.return_value = self._drive_file('anterior-id', ['pasta-id'])
+        self.uploader.upload_file.return_value = {'id': 'anterior-id', 'name': 'audio.mp3'}
+        cache = {
+            'hashes': {'hash-antigo': 'anterior-id'},
+            'stats': {'audio.mp3': {'mtime_ns': 0, 'size': 0,
+                                    'sha256': 'hash-antigo', 'file_id': 'anterior-id'}}
+        }
+        
+        file_info = self._upload(cache)
+        
+        self.uploader.upload_file.assert_called_once_with(
+            os.path.join(self.temp_dir, 'audio.mp3'), 'pasta-id', 'desc', file_id='anterior-id'
+        )
+        self.service.files().copy.assert_not_called()
+        self.assertEqual(file_info['id'], 'anterior-id')
+        self.assertEqual(cache['stats']['audio.mp3']['sha256'], self.digest)
+    
+    def test_stale_manifest_entry_falls_back_to_upload(self):
+        """Arquivo do manifesto removido do Drive: files.get falha e o arquivo é reenviado"""
+        from googleapiclient.errors import HttpError
+        
+        self.service.files().get().execute.side_effect = HttpError(
+            SimpleNamespace(status=404, reason='Not Found'), b''
+        )
+        cache = {'hashes': {self.digest: 'removido-id'}, 'stats': {}}
+        
+        file_info = self._upload(cache)
+        
+        self.service.files().copy.assert_not_called()
+        self.uploader.upload_file.assert_called_once_with(
+            os.path.join(self.temp_dir, 'audio.mp3'), 'pasta-id', 'desc'
+        )
+        self.assertEqual(file_info['id'], 'novo-id')
+        self.assertEqual(cache['hashes'][self.digest], 'novo-id')
+    
+    def test_trashed_manifest_entry_falls_back_to_upload(self):
+        """Arquivo do manifesto na lixeira: tratado como removido"""
+        self.service.files().get().execute.return_value = self._drive_file(
+            'lixeira-id', ['pasta-id'], trashed=True
+        )
+        cache = {'hashes': {self.digest: 'lixeira-id'}, 'stats': {}}
+        
+        file_info = self._upload(cache)
+        
+        self.service.files().copy.assert_not_called()
+        self.uploader.upload_file.assert_called_once()
+        self.assertEqual(file_info['id'], 'novo-id')
+
+    def test_folders_batch_respects_request_limit(self):
+        """Criação de pastas em lote: no máximo 100 requisições por batch"""
+        batches = []
+        
+        def new_batch(callback):
+            batch = MagicMock()
+            batch.requests = []
+            batch.add.side_effect = lambda request, request_id: batch.requests.append(request_id)
+            batch.execute.side_effect = lambda: [
+                callback(name, {'id': f'id-{name}', 'webViewLink': f'url-{name}'}, None)
+                for name in batch.requests
+            ]
+            batches.append(batch)
+            return batch
+        
+        self.uploader.service = self.service
+        self.service.new_batch_http_request.side_effect = new_batch
+        names = [f'Pasta{i}' for i in range(150)]
+        
+        created = self.uploader.create_folders_batch(names, 'pai-id')
+        
+        self.assertEqual([len(batch.requests) for batch in batches], [100, 50])
+        self.assertEqual(created['Pasta120'], ('id-Pasta120', 'url-Pasta120'))
+    
+    def test_limits_read_after_env_is_loaded(self):
+        """Limites definidos só no .env valem, mesmo com o módulo já importado"""
+        from drive_uploader import DriveUploader
+        
+        def load_env():
+            os.environ['DRIVE_UPLOAD_WORKERS'] = '3'
+            os.environ['DRIVE_MAX_REQUESTS_PER_SECOND'] = '4'
+        
+        with patch.dict(os.environ), \
+             patch('drive_uploader.ensure_env_loaded', side_effect=load_env), \
+             patch.object(DriveUploader, '_authenticate'):
+            uploader = DriveUploader()
+        
+        self.assertEqual(uploader.upload_workers, 3)
+        self.assertEqual(uploader.max_requests_per_second, 4.0)
+        self.assertAlmostEqual(uploader._rate_limiter._interval, 0.25)
+    
+    def test_rate_limiter_spaces_requests(self):
+        """O limitador espaça chamadas consecutivas pelo intervalo configurado"""
+        from drive_uploader import _RateLimiter
+        
+        limiter = _RateLimiter(10)
+        with patch('drive_uploader.time.sleep') as mock_sleep:
+            limiter.wait()
+            limiter.wait()
+        
+        mock_sleep.assert_called_once()
+        self.assertAlmostEqual(mock_sleep.call_args[0][0], 0.1, delta=0.02)
+
 class TestScriptGenerator(unittest.TestCase):
     """Testes para o gerador de roteiros"""
     
@@ -168,6 +376,12 @@ class TestScriptGenerator(unittest.TestCase):
 class TestPipelineIntegration(unittest.TestCase):
     """Testes de integração do pipeline"""
     
+    @classmethod
+    def setUpClass(cls):
+        # Uma listagem da raiz do projeto atende todas as checagens de existência
+        with os.scandir('.') as entries:
+            cls._root_entries = frozenset(entry.name for entry in entries)
+    
     def setUp(self):
         self.temp_dir = Path(tempfile.mkdtemp())
     
@@ -184,8 +398,8 @@ class TestPipelineIntegration(unittest.TestCase):
         
         for dir_name in required_dirs:
             with self.subTest(directory=dir_name):
-                self.assertTrue(
-                    Path(dir_name).exists(),
+                self.assertIn(
+                    dir_name, self._root_entries,
                     f"Diretório {dir_name} deve existir"
                 )
     
@@ -200,8 +414,8 @@ class TestPipelineIntegration(unittest.TestCase):
         
         for file_name in required_files:
             with self.subTest(file=file_name):
-                self.assertTrue(
-                    Path(file_name).exists(),
+                self.assertIn(
+                    file_name, self._root_entries,
                     f"Arquivo {file_name} deve existir"
                 )
     
@@ -222,16 +436,21 @@ class TestPipelineIntegration(unittest.TestCase):
                     self.assertIn(var, content, 
                                 f"Variável {var} deve estar em .env.example")
     
-    @patch('pipeline_integrado.os.system')
-    def test_pipeline_method_calls(self, mock_system):
+    @patch('pipeline_integrado.asyncio.create_subprocess_exec', new_callable=AsyncMock)
+    def test_pipeline_method_calls(self, mock_exec):
         """Testa chamadas de métodos do pipeline"""
-        mock_system.return_value = 0  # Simular sucesso
+        mock_proc = MagicMock(returncode=0)  # Simular sucesso
+        mock_proc.stdout.read = AsyncMock(side_effect=[b"ok\n", b""])
+        mock_proc.stderr.read = AsyncMock(return_value=b"")
+        mock_proc.wait = AsyncMock(return_value=0)
+        mock_exec.return_value = mock_proc
         
         try:
             from pipeline_integrado import PipelineIntegrado
             
             # Criar instância mock
             pipeline = PipelineIntegrado.__new__(PipelineIntegrado)
+            pipeline.today_date = "2025-01-01"
             pipeline.project_name = "Teste"
             pipeline.output_dir = self.temp_dir
             pipeline.row_index = 1
@@ -239,10 +458,11 @@ class TestPipelineIntegration(unittest.TestCase):
             
             # Testar método de descoberta
             pipeline._update_sheet_status = MagicMock()
-            result = pipeline.descobrir_conteudo()
+            with patch('pipeline_integrado.OUTPUT_BASE_DIR', self.temp_dir):
+                result = asyncio.run(pipeline.descobrir_conteudo())
             
             # Verificar se foi chamado corretamente
-            mock_system.assert_called()
+            mock_exec.assert_called()
             
         except ImportError:
             self.skipTest("PipelineIntegrado não disponível")
@@ -262,49 +482,46 @@ class TestImageProcessor(unittest.TestCase):
         except ImportError:
             self.skipTest("Image processor não disponível")
     
-    @patch('requests.get')
-    def test_unsplash_download_mock(self, mock_get):
+    def test_unsplash_download_mock(self):
         """Testa download de imagem do Unsplash com mock"""
         try:
+            import requests
             from youtube_automation.image_processor import download_unsplash_image
-            
-            # Mock da resposta HTTP
-            mock_response = MagicMock()
-            mock_response.content = b'fake_image_data_test'
-            mock_response.status_code = 200
-            mock_get.return_value = mock_response
-            
-            result = download_unsplash_image("test query")
-            self.assertEqual(result, b'fake_image_data_test')
-            
         except ImportError:
             self.skipTest("Image processor não disponível")
+        
+        # Stub direto em requests.get (sem patch/MagicMock), restaurado ao final do teste
+        response = SimpleNamespace(content=b'fake_image_data_test', status_code=200, json=dict)
+        self.addCleanup(setattr, requests, 'get', requests.get)
+        requests.get = lambda *args, **kwargs: response
+        
+        result = download_unsplash_image("test query")
+        self.assertEqual(result, b'fake_image_data_test')
 
 class TestContentDiscovery(unittest.TestCase):
     """Testes para descoberta de conteúdo"""
     
-    @patch('requests.get')
-    def test_youtube_trends_mock(self, mock_get):
+    def test_youtube_trends_mock(self):
         """Testa obtenção de tendências do YouTube"""
         try:
+            import requests
             from youtube_automation.content_discovery import get_youtube_trends
-            
-            # Mock da resposta
-            mock_response = MagicMock()
-            mock_response.json.return_value = {
-                'items': [
-                    {'snippet': {'title': 'Tendência 1'}},
-                    {'snippet': {'title': 'Tendência 2'}}
-                ]
-            }
-            mock_response.status_code = 200
-            mock_get.return_value = mock_response
-            
-            trends = get_youtube_trends()
-            self.assertIsInstance(trends, list)
-            
         except ImportError:
             self.skipTest("Content discovery não disponível")
+        
+        # Stub direto em requests.get (sem patch/MagicMock), restaurado ao final do teste
+        payload = {
+            'items': [
+                {'snippet': {'title': 'Tendência 1'}},
+                {'snippet': {'title': 'Tendência 2'}}
+            ]
+        }
+        response = SimpleNamespace(status_code=200, json=lambda: payload)
+        self.addCleanup(setattr, requests, 'get', requests.get)
+        requests.get = lambda *args, **kwargs: response
+        
+        trends = get_youtube_trends()
+        self.assertIsInstance(trends, list)
 
 class TestSystemRequirements(unittest.TestCase):
     """Testes de requisitos do sistema"""
@@ -336,45 +553,87 @@ class TestSystemRequirements(unittest.TestCase):
 class TestSecurityAndValidation(unittest.TestCase):
     """Testes de segurança e validação"""
     
+    # Atribuições suspeitas fora de linhas de comentário, em uma passada por arquivo
+    CREDENTIAL_PATTERN = re.compile(
+        rb'^(?![ \t]*#).*?(?:password|api_key|secret|token)=.*$',
+        re.MULTILINE | re.IGNORECASE
+    )
+    SKIP_DIRS = {'.git', '__pycache__'}
+    
+    def _python_files(self, root='.'):
+        """Percorre o projeto com os.scandir (pilha explícita) retornando arquivos .py"""
+        stack = [root]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in self.SKIP_DIRS:
+                            stack.append(entry.path)
+                    elif entry.name.endswith('.py') and entry.name != 'test_pipeline.py':
+                        yield entry.path
+    
     def test_no_hardcoded_credentials(self):
         """Verifica se não há credenciais hardcoded no código"""
-        patterns_to_avoid = [
-            'password=',
-            'api_key=',
-            'secret=',
-            'token='
-        ]
-        
-        python_files = Path('.').glob('**/*.py')
-        
-        for file_path in python_files:
-            if file_path.name == 'test_pipeline.py':
-                continue  # Pular arquivo de teste
-                
+        for file_path in self._python_files():
             try:
-                content = file_path.read_text().lower()
-                for pattern in patterns_to_avoid:
-                    with self.subTest(file=file_path, pattern=pattern):
-                        if pattern in content:
-                            # Verificar se é comentário ou exemplo
-                            lines = content.split('\n')
-                            for line in lines:
-                                if pattern in line and not line.strip().startswith('#'):
-                                    self.fail(f"Possível credencial hardcoded em {file_path}: {line.strip()}")
-            except Exception:
+                with open(file_path, 'rb') as f:
+                    data = f.read()
+            except OSError:
                 # Ignorar arquivos que não podem ser lidos
-                pass
+                continue
+            
+            with self.subTest(file=file_path):
+                match = self.CREDENTIAL_PATTERN.search(data)
+                if match:
+                    line = match.group().decode(errors='replace').strip()
+                    self.fail(f"Possível credencial hardcoded em {file_path}: {line}")
+
+class _ReportTestResult(unittest.TextTestResult):
+    """Guarda a mensagem de cada falha/erro a partir da exceção, sem reprocessar o traceback"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.failure_messages = []
+        self.error_messages = []
+    
+    def addFailure(self, test, err):
+        super().addFailure(test, err)
+        self.failure_messages.append((str(test), str(err[1]) or 'Falha na asserção'))
+    
+    def addError(self, test, err):
+        super().addError(test, err)
+        self.error_messages.append((str(test), f"{err[0].__name__}: {err[1]}"))
+    
+    def addSubTest(self, test, subtest, err):
+        # Falhas de subTest não passam por addFailure/addError
+        super().addSubTest(test, subtest, err)
+        if err is None:
+            return
+        if issubclass(err[0], test.failureException):
+            self.failure_messages.append((str(subtest), str(err[1]) or 'Falha na asserção'))
+        else:
+            self.error_messages.append((str(subtest), f"{err[0].__name__}: {err[1]}"))
+
+def _run_test_class(test_class):
+    """Executa uma classe de teste (em processo separado) e retorna dados serializáveis"""
+    stream = io.StringIO()
+    suite = unittest.TestLoader().loadTestsFromTestCase(test_class)
+    runner = unittest.TextTestRunner(verbosity=2, stream=stream, resultclass=_ReportTestResult)
+    result = runner.run(suite)
+    return (
+        stream.getvalue(),
+        result.testsRun,
+        result.failure_messages,
+        result.error_messages,
+    )
 
 def run_comprehensive_tests():
     """Executa todos os testes com relatório detalhado"""
     
-    # Configurar descoberta de testes
-    loader = unittest.TestLoader()
-    suite = unittest.TestSuite()
-    
     # Adicionar classes de teste
     test_classes = [
         TestDriveUploader,
+        TestDriveUploadCache,
         TestScriptGenerator,
         TestPipelineIntegration,
         TestImageProcessor,
@@ -383,39 +642,43 @@ def run_comprehensive_tests():
         TestSecurityAndValidation
     ]
     
-    for test_class in test_classes:
-        tests = loader.loadTestsFromTestCase(test_class)
-        suite.addTests(tests)
+    # Classes independentes: uma por processo, saída impressa na ordem original
+    with ProcessPoolExecutor() as executor:
+        outputs = list(executor.map(_run_test_class, test_classes))
     
-    # Executar testes
-    runner = unittest.TextTestRunner(verbosity=2, stream=sys.stdout)
-    result = runner.run(suite)
+    tests_run = 0
+    failures = []
+    errors = []
+    for output, class_tests_run, class_failures, class_errors in outputs:
+        sys.stdout.write(output)
+        tests_run += class_tests_run
+        failures.extend(class_failures)
+        errors.extend(class_errors)
     
     # Relatório detalhado
     print(f"\n{'='*60}")
     print(f"RELATÓRIO COMPLETO DE TESTES")
     print(f"{'='*60}")
-    print(f"Total de testes: {result.testsRun}")
-    print(f"Sucessos: {result.testsRun - len(result.failures) - len(result.errors)}")
-    print(f"Falhas: {len(result.failures)}")
-    print(f"Erros: {len(result.errors)}")
-    print(f"Taxa de sucesso: {((result.testsRun - len(result.failures) - len(result.errors)) / result.testsRun * 100):.1f}%")
+    print(f"Total de testes: {tests_run}")
+    print(f"Sucessos: {tests_run - len(failures) - len(errors)}")
+    print(f"Falhas: {len(failures)}")
+    print(f"Erros: {len(errors)}")
+    print(f"Taxa de sucesso: {((tests_run - len(failures) - len(errors)) / tests_run * 100):.1f}%")
     
-    if result.failures:
+    if failures:
         print(f"\n📋 FALHAS DETALHADAS:")
-        for i, (test, trace) in enumerate(result.failures, 1):
+        for i, (test, message) in enumerate(failures, 1):
             print(f"\n{i}. {test}")
-            print(f"   Erro: {trace.split('AssertionError:')[-1].strip() if 'AssertionError:' in trace else 'Falha na asserção'}")
+            print(f"   Erro: {message}")
     
-    if result.errors:
+    if errors:
         print(f"\n🚨 ERROS DETALHADOS:")
-        for i, (test, trace) in enumerate(result.errors, 1):
+        for i, (test, message) in enumerate(errors, 1):
             print(f"\n{i}. {test}")
-            error_msg = trace.split('\n')[-2] if '\n' in trace else trace
-            print(f"   Erro: {error_msg.strip()}")
+            print(f"   Erro: {message}")
     
     # Recomendações baseadas nos resultados
-    if result.failures or result.errors:
+    if failures or errors:
         print(f"\n💡 RECOMENDAÇÕES:")
         print(f"1. Configure as variáveis de ambiente no arquivo .env")
         print(f"2. Instale todas as dependências: pip install -r requirements.txt")
@@ -425,7 +688,7 @@ def run_comprehensive_tests():
         print(f"\n🎉 TODOS OS TESTES PASSARAM!")
         print(f"O pipeline está pronto para uso.")
     
-    return result.wasSuccessful()
+    return not failures and not errors
 
 if __name__ == "__main__":
     success = run_comprehensive_tests()
@@ -189,7 +189,9 @@ class ContentDiscovery:
 def main():
     """Função principal para execução standalone"""
     parser = argparse.ArgumentParser(description='Descoberta de Conteúdo')
-    parser.add_argument('--output-dir', required=True, help='Diretório de saída')
+    # O pipeline integrado passa o diretório via PIPELINE_OUTPUT_DIR
+    parser.add_argument('--output-dir', default=os.environ.get('PIPELINE_OUTPUT_DIR'),
+                        required='PIPELINE_OUTPUT_DIR' not in os.environ, help='Diretório de saída')
     
     args = parser.parse_args()
     output_dir = Path(args.output_dir)
@@ -87,7 +87,9 @@ def download_unsplash_image(query, width=1280, height=720):
 def main():
     """Função principal"""
     parser = argparse.ArgumentParser(description='Processador de imagens')
-    parser.add_argument('--output-dir', type=str, required=True, 
+    # O pipeline integrado passa o diretório via PIPELINE_OUTPUT_DIR
+    parser.add_argument('--output-dir', type=str, default=os.environ.get('PIPELINE_OUTPUT_DIR'),
+                        required='PIPELINE_OUTPUT_DIR' not in os.environ,
                         help='Diretório para salvar as imagens')
     args = parser.parse_args()
     
@@ -238,7 +238,9 @@ class NarrationGenerator:
 def main():
     """Função principal do gerador de narração"""
     parser = argparse.ArgumentParser(description='Gera narração para o roteiro')
-    parser.add_argument('--output-dir', type=str, required=True,
+    # O pipeline integrado passa o diretório via PIPELINE_OUTPUT_DIR
+    parser.add_argument('--output-dir', type=str, default=os.environ.get('PIPELINE_OUTPUT_DIR'),
+                        required='PIPELINE_OUTPUT_DIR' not in os.environ,
                         help='Diretório do projeto')
     args = parser.parse_args()
     
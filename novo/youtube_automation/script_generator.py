@@ -489,10 +489,13 @@ def main():
     import argparse
     
     parser = argparse.ArgumentParser(description='Gerador de Roteiros')
-    parser.add_argument('--topic', required=True, help='Tópico do vídeo')
+    # No pipeline integrado o tópico é o nome do projeto (PIPELINE_PROJECT_NAME)
+    parser.add_argument('--topic', default=os.environ.get('PIPELINE_PROJECT_NAME'),
+                        required='PIPELINE_PROJECT_NAME' not in os.environ, help='Tópico do vídeo')
     parser.add_argument('--type', default='mystery', choices=['mystery', 'educational', 'entertainment'],
                        help='Tipo de roteiro')
-    parser.add_argument('--output-dir', default='output', help='Diretório de saída')
+    parser.add_argument('--output-dir', default=os.environ.get('PIPELINE_OUTPUT_DIR', 'output'),
+                        help='Diretório de saída')
     
     args = parser.parse_args()
     
@@ -280,7 +280,9 @@ class VideoAssembler:
 def main():
     """Função principal para execução standalone"""
     parser = argparse.ArgumentParser(description='Montagem de Vídeo')
-    parser.add_argument('--output-dir', required=True, help='Diretório de trabalho')
+    # O pipeline integrado passa o diretório via PIPELINE_OUTPUT_DIR
+    parser.add_argument('--output-dir', default=os.environ.get('PIPELINE_OUTPUT_DIR'),
+                        required='PIPELINE_OUTPUT_DIR' not in os.environ, help='Diretório de trabalho')
     
     args = parser.parse_args()
     output_dir = Path(args.output_dir)